@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Times SAMIWriter on a large multi-language caption set.
+
+Usage: python benchmarks/sami_writer.py [languages] [captions per language]
+"""
+import sys
+import timeit
+
+from pycaption import SAMIWriter, CaptionSet, Caption, CaptionNode
+from pycaption.geometry import Layout, Point, Size, UnitEnum
+
+
+def create_caption_set(languages, captions_per_language):
+    """
+    :returns: CaptionSet of the given size, with a few distinct layouts and
+        styles, as a converted SCC or DFXP file has
+    """
+    layouts = [
+        Layout(origin=Point(Size(10 * i, UnitEnum.PERCENT),
+                            Size(80, UnitEnum.PERCENT)))
+        for i in range(4)
+    ]
+    caption_set = CaptionSet()
+    for lang_index in range(languages):
+        lang = u'l{}'.format(lang_index)
+        captions = []
+        for i in range(captions_per_language):
+            caption = Caption(layout_info=layouts[i % len(layouts)])
+            caption.start = i * 2000000
+            caption.end = caption.start + 1500000
+            caption.nodes = [
+                CaptionNode.create_text(u'Caption {} of {}'.format(i, lang)),
+                CaptionNode.create_break(),
+                CaptionNode.create_style(True, {u'italics': True}),
+                CaptionNode.create_text(u'second line'),
+                CaptionNode.create_style(False, {u'italics': True}),
+            ]
+            captions.append(caption)
+        caption_set.set_captions(lang, captions)
+    return caption_set
+
+
+def main():
+    languages = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    captions_per_language = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+
+    caption_set = create_caption_set(languages, captions_per_language)
+    times = timeit.repeat(
+        lambda: SAMIWriter().write(caption_set), repeat=3, number=1)
+    print(u'{} languages x {} captions: {:.3f}s (best of 3)'.format(
+        languages, captions_per_language, min(times)))
+
+
+if __name__ == '__main__':
+    main()
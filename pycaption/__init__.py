@@ -4,6 +4,9 @@ from .sami import SAMIReader, SAMIWriter
 from .srt import SRTReader, SRTWriter
 from .scc import SCCReader, SCCWriter
 from .webvtt import WebVTTReader, WebVTTWriter
+from .cue_index import CueIndex
+from .hls import HLSWebVTTWriter
+from .tail import TailState
 from .exceptions import (
     CaptionReadError, CaptionReadNoCaptions, CaptionReadSyntaxError)
 
@@ -12,8 +15,10 @@ __all__ = [
     'CaptionConverter', 'DFXPReader', 'DFXPWriter',
     'SAMIReader', 'SAMIWriter', 'SRTReader', 'SRTWriter',
     'SCCReader', 'SCCWriter', 'WebVTTReader', 'WebVTTWriter',
+    'HLSWebVTTWriter',
     'CaptionReadError', 'CaptionReadNoCaptions', 'CaptionReadSyntaxError',
-    'detect_format', 'Caption', 'CaptionSet', 'CaptionNode'
+    'detect_format', 'Caption', 'CaptionSet', 'CaptionNode', 'CueIndex',
+    'TailState'
 ]
 
 SUPPORTED_READERS = (
@@ -1,5 +1,6 @@
-from collections import defaultdict
+from collections import OrderedDict
 from datetime import timedelta
+from multiprocessing import Pool
 
 
 DEFAULT_LANGUAGE_CODE = u'en-US'
@@ -18,9 +19,17 @@ class CaptionConverter(object):
     def __init__(self, captions=None):
         self.captions = captions if captions else []
 
-    def read(self, content, caption_reader):
+    def read(self, content, caption_reader, languages=None):
+        """
+        :param languages: If given, only these languages are read. Supported
+            by the readers of multi-language formats (DFXP and SAMI).
+        """
         try:
-            self.captions = caption_reader.read(content)
+            if languages is None:
+                self.captions = caption_reader.read(content)
+            else:
+                self.captions = caption_reader.read(
+                    content, languages=languages)
         except AttributeError, e:
             raise Exception(e)
         return self
@@ -87,6 +96,70 @@ class BaseWriter(object):
         return content
 
 
+class BaseSingleLanguageWriter(BaseWriter):
+    """
+    Base for the writers of the formats supporting a single language, which
+    write the first language of a caption set, or each one of them apart.
+
+    The subclasses implement _write_language(caption_set, lang), which must
+    not modify the caption set.
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        :param processes: If more than 1, write_languages writes the languages
+            in a pool of this many processes
+        """
+        self.processes = kwargs.pop(u'processes', 1)
+        super(BaseSingleLanguageWriter, self).__init__(*args, **kwargs)
+
+    def write_languages(self, caption_set, languages=None):
+        """
+        Write each language of the caption set to its own output, in one
+        call. The work depending only on the layouts (e.g. their
+        relativization) is shared by the languages, and nothing is copied.
+
+        :type caption_set: CaptionSet
+        :param languages: the languages to write, all of them by default
+        :returns: dict of the output of each language
+        """
+        if languages is None:
+            languages = caption_set.get_languages()
+        languages = list(languages)
+
+        if not self.processes or self.processes < 2 or len(languages) < 2:
+            outputs = [self._write_language(caption_set, lang)
+                       for lang in languages]
+        else:
+            # Each process only gets the captions of its language
+            pool = Pool(min(self.processes, len(languages)))
+            try:
+                outputs = pool.map(
+                    _write_language,
+                    [(self, _get_language_subset(caption_set, lang), lang)
+                     for lang in languages]
+                )
+            finally:
+                pool.close()
+                pool.join()
+
+        return dict(zip(languages, outputs))
+
+    def _get_language(self, caption_set):
+        """
+        :type caption_set: CaptionSet
+        :returns: the language written by write(): the first one set in the
+            caption set (see CaptionSet.get_languages)
+        """
+        return caption_set.get_languages()[0]
+
+    def _write_language(self, caption_set, lang):
+        """
+        :type caption_set: CaptionSet
+        :rtype: unicode
+        """
+        pass
+
+
 class Style(object):
     def __init__(self):
         pass
@@ -235,13 +308,18 @@ class CaptionSet(object):
         # information
         self._layout_info = {}
 
-        # Captions by language.
-        self._captions = defaultdict(list)
+        # Captions by language, in the order the languages were first set
+        self._captions = OrderedDict()
 
     def set_captions(self, lang, captions):
         self._captions[lang] = captions
 
     def get_languages(self):
+        """
+        Returns the languages in the order their captions were first set,
+        i.e. the order the readers find them in the source, so that the
+        writers of a single language all pick the same one.
+        """
         return self._captions.keys()
 
     def get_captions(self, lang):
@@ -299,6 +377,28 @@ class CaptionSet(object):
             self.set_captions(lang, out_captions)
 
 # Functions
+def _get_language_subset(caption_set, lang):
+    """
+    :type caption_set: CaptionSet
+    :returns: CaptionSet sharing the captions, layout and styles of the given
+        language
+    """
+    subset = CaptionSet()
+    subset.set_styles(dict(caption_set.get_styles()))
+    subset.layout_info = caption_set.layout_info
+    subset.set_layout_info(lang, caption_set.get_layout_info(lang))
+    subset.set_captions(lang, caption_set.get_captions(lang))
+    return subset
+
+
+def _write_language(args):
+    """
+    Runs BaseSingleLanguageWriter._write_language in the processes of a pool.
+    """
+    writer, caption_set, lang = args
+    return writer._write_language(caption_set, lang)
+
+
 def merge_concurrent_captions(caption_set):
     """Merge captions that have the same start and end times"""
     for lang in caption_set.get_languages():
@@ -0,0 +1,200 @@
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left, bisect_right
+
+from .exceptions import InvalidInputError
+
+
+class CueIndex(object):
+    """
+    An index of the cues of an SRT or WebVTT file: the start, end, byte
+    offset and byte length of each one, so that the cues of a time range can
+    be read without reading the whole file.
+
+    The offset of a cue is the one of its timing line, and its length goes
+    until the blank line ending it, so the identifiers aren't included.
+    """
+    def __init__(self, entries=None, source_size=0, source_mtime=0):
+        """
+        :param entries: list of (start, end, offset, length) tuples, in the
+            order of the file. The times are in microseconds.
+        :param source_size: the size of the indexed file, in bytes
+        :param source_mtime: the modification time of the indexed file
+        """
+        self.entries = entries if entries else []
+        self.source_size = source_size
+        self.source_mtime = source_mtime
+        self._by_start = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, path):
+        """
+        Index the cues of a file in a single scan of its memory-mapped
+        content. WebVTT files are recognized by their header, the others are
+        indexed as SRT.
+
+        :param path: the path of the caption file
+        :rtype: CueIndex
+        """
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # An empty file can't be memory-mapped
+            if not f.read(1):
+                return cls(None, stat.st_size, stat.st_mtime)
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return cls(list(_scan_cues(content)),
+                           stat.st_size, stat.st_mtime)
+            finally:
+                content.close()
+
+    @classmethod
+    def load(cls, path, source_path):
+        """
+        Load an index, unless the indexed file has changed since it was
+        built, in which case the file is indexed again.
+
+        :param path: the path of an index written by save()
+        :param source_path: the path of the indexed file
+        :rtype: CueIndex
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        header_size = len(_INDEX_MAGIC) + _HEADER_FORMAT.size
+        if not data.startswith(_INDEX_MAGIC) or len(data) < header_size:
+            raise InvalidInputError('The file is not a cue index.')
+        source_size, source_mtime, count = _HEADER_FORMAT.unpack_from(
+            data, len(_INDEX_MAGIC))
+        if len(data) != header_size + count * _ENTRY_FORMAT.size:
+            raise InvalidInputError('The cue index is truncated.')
+
+        stat = os.stat(source_path)
+        if (stat.st_size, stat.st_mtime) != (source_size, source_mtime):
+            return cls.build(source_path)
+
+        return cls([
+            _ENTRY_FORMAT.unpack_from(
+                data, header_size + i * _ENTRY_FORMAT.size)
+            for i in range(count)
+        ], source_size, source_mtime)
+
+    def save(self, path):
+        """
+        Write the index in a compact binary form, e.g. next to the caption
+        file.
+
+        :param path: the path of the index file
+        """
+        with open(path, 'wb') as f:
+            f.write(_INDEX_MAGIC)
+            f.write(_HEADER_FORMAT.pack(
+                self.source_size, self.source_mtime, len(self.entries)))
+            for entry in self.entries:
+                f.write(_ENTRY_FORMAT.pack(*entry))
+
+    def find(self, start, end):
+        """
+        :param start: the start of the time range, in microseconds
+        :param end: the end of the time range, in microseconds
+        :returns: list of (offset, length) tuples of the cues overlapping the
+            range, in the order of the file
+        """
+        if self._by_start is None:
+            self._index_by_start()
+        starts, max_ends, entries = self._by_start
+
+        # The cues before the first one whose end (or the end of a cue
+        # before it) is after the start of the range can't overlap it
+        low = bisect_right(max_ends, start)
+        high = bisect_left(starts, end)
+
+        return sorted(
+            (offset, length)
+            for cue_start, cue_end, offset, length in entries[low:high]
+            if cue_end > start
+        )
+
+    def read_cues(self, fp, start, end, encoding='utf-8'):
+        """
+        :param fp: the caption file, opened in binary mode
+        :param start: the start of the time range, in microseconds
+        :param end: the end of the time range, in microseconds
+        :returns: generator of the unicode text of the cues overlapping the
+            range, from their timing line
+        """
+        for offset, length in self.find(start, end):
+            fp.seek(offset)
+            yield fp.read(length).decode(encoding)
+
+    def _index_by_start(self):
+        entries = sorted(self.entries)
+        max_ends = []
+        max_end = 0
+        for entry in entries:
+            max_end = max(max_end, entry[1])
+            max_ends.append(max_end)
+
+        self._by_start = ([entry[0] for entry in entries], max_ends, entries)
+
+
+def _scan_cues(content):
+    """
+    :param content: the bytes (or memory-mapped file) of an SRT or WebVTT
+        file
+    :returns: generator of (start, end, offset, length) tuples
+    """
+    if _WEBVTT_HEADER_PATTERN.match(content):
+        # A WebVTT cue ends at an empty line
+        blank_line_pattern = _EMPTY_LINE_PATTERN
+    else:
+        blank_line_pattern = _BLANK_LINE_PATTERN
+
+    position = 0
+    while True:
+        timing = _TIMING_LINE_PATTERN.search(content, position)
+        if timing is None:
+            return
+
+        blank_line = blank_line_pattern.search(content, timing.end())
+        position = blank_line.start() if blank_line else len(content)
+
+        yield (_timestamp_to_microseconds(*timing.group(1, 2, 3, 4)),
+               _timestamp_to_microseconds(*timing.group(5, 6, 7, 8)),
+               timing.start(), position - timing.start())
+
+
+def _timestamp_to_microseconds(first, second, third, milliseconds):
+    """
+    :returns: the microseconds of a timestamp, whose hours and milliseconds
+        are optional
+    """
+    if third is None:
+        hours, minutes, seconds = 0, first, second
+    else:
+        hours, minutes, seconds = first, second, third
+    microseconds = (int(hours) * 3600 + int(minutes) * 60 +
+                    int(seconds)) * 1000000
+    if milliseconds:
+        microseconds += int(milliseconds) * 1000
+    return microseconds
+
+
+_INDEX_MAGIC = b'PYCAPTION-CUE-INDEX-2\n'
+# size and modification time of the indexed file, count of the cues
+_HEADER_FORMAT = struct.Struct('<QdI')
+# start, end, offset, length
+_ENTRY_FORMAT = struct.Struct('<QQQI')
+
+_TIMESTAMP = b'(\d+):(\d+)(?::(\d+))?(?:[,.](\d+))?'
+_TIMING_LINE_PATTERN = re.compile(
+    b'^[ \t]*' + _TIMESTAMP + b'[ \t]*-->[ \t]*' + _TIMESTAMP,
+    re.MULTILINE)
+_WEBVTT_HEADER_PATTERN = re.compile(b'(?:\xef\xbb\xbf)?WEBVTT')
+_EMPTY_LINE_PATTERN = re.compile(b'\r?\n\r?\n')
+_BLANK_LINE_PATTERN = re.compile(b'\r?\n[ \t\f\v]*\r?\n')
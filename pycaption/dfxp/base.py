@@ -45,6 +45,11 @@ DFXP_DEFAULT_REGION = Layout(
 DFXP_DEFAULT_STYLE_ID = u'default'
 DFXP_DEFAULT_REGION_ID = u'bottom'
 
+# Line breaks inside a <p> tag. The pretty one keeps the text indented under
+# the break when the document is prettified.
+DFXP_LINE_BREAK = u'<br/>\n    '
+DFXP_COMPACT_LINE_BREAK = u'<br/>'
+
 
 class DFXPReader(BaseReader):
     def __init__(self, *args, **kw):
@@ -58,17 +63,26 @@ class DFXPReader(BaseReader):
         else:
             return False
 
-    def read(self, content):
+    def read(self, content, languages=None):
+        """
+        :type content: unicode
+        :param languages: If given, only the captions in these languages are
+            read. The other <div> tags are skipped entirely.
+        :rtype: CaptionSet
+        """
         if type(content) != unicode:
             raise InvalidInputError(u'The content is not a unicode string.')
 
         dfxp_document = self._get_dfxp_parser_class()(
-            content, read_invalid_positioning=self.read_invalid_positioning)
+            content, read_invalid_positioning=self.read_invalid_positioning,
+            languages=languages)
         captions = CaptionSet()
 
         # Each div represents all the captions for a single language.
         for div in dfxp_document.find_all(u'div'):
-            lang = div.attrs.get(u'xml:lang', DEFAULT_LANGUAGE_CODE)
+            lang = _get_div_language(div)
+            if languages is not None and lang not in languages:
+                continue
             captions.set_captions(lang, self._translate_div(div))
             captions.set_layout_info(lang, div.layout_info)
 
@@ -222,11 +236,27 @@ class DFXPReader(BaseReader):
 
 class DFXPWriter(BaseWriter):
     def __init__(self, *args, **kwargs):
+        """
+        :param write_inline_positioning: If True, the positioning attributes
+            of the region are also written on every element referencing it
+        :param compact: If True, the output is not prettified. No whitespace
+            is added between the tags, which makes for noticeably smaller
+            files and a faster serialization
+        :param region_precision: If set, the positioning values are rounded
+            to this number of digits before the regions are created, so that
+            layouts differing only by rounding artefacts share one region
+        """
         self.write_inline_positioning = kwargs.pop(
             u'write_inline_positioning', False)
+        self.compact = kwargs.pop(u'compact', False)
+        self.region_precision = kwargs.pop(u'region_precision', None)
         self.p_style = False
         self.open_span = False
         self.region_creator = None
+        # The ids of the <style> tags of the document being written, and the
+        # attributes already rendered for each style dict
+        self._style_ids = set()
+        self._style_attributes = {}
         super(DFXPWriter, self).__init__(*args, **kwargs)
 
     def write(self, caption_set, force=u''):
@@ -237,15 +267,25 @@ class DFXPWriter(BaseWriter):
 
         :rtype: unicode
         """
-        dfxp = BeautifulSoup(DFXP_BASE_MARKUP, u'xml')
+        return self._write(deepcopy(caption_set), force)
+
+    def _write(self, caption_set, force=u''):
+        """Like write, but the layout information of the captions and nodes
+        in the caption_set is replaced while writing. Only for caption sets
+        that aren't shared with the caller.
+
+        :type caption_set: pycaption.base.CaptionSet
+        :param force: only use this language, if available in the caption_set
+
+        :rtype: unicode
+        """
+        dfxp = _create_document(DFXP_BASE_MARKUP, self.compact)
         dfxp.find(u'tt')[u'xml:lang'] = u"en"
 
         langs = caption_set.get_languages()
         if force in langs:
             langs = [force]
 
-        caption_set = deepcopy(caption_set)
-
         # Loop through all captions/nodes and apply transformations to layout
         # in function of the provided or default settings
         for lang in langs:
@@ -263,8 +303,10 @@ class DFXPWriter(BaseWriter):
         if not caption_set.get_styles():
             dfxp = self._recreate_styling_tag(
                 DFXP_DEFAULT_STYLE_ID, DFXP_DEFAULT_STYLE, dfxp)
+        self._index_styles(dfxp)
 
-        self.region_creator = self._get_region_creator_class()(dfxp, caption_set)
+        self.region_creator = self._get_region_creator_class()(
+            dfxp, caption_set, precision=self.region_precision)
         self.region_creator.create_document_regions()
 
         body = dfxp.find(u'body')
@@ -287,8 +329,7 @@ class DFXPWriter(BaseWriter):
 
             body.append(div)
         self.region_creator.cleanup_regions()
-        caption_content = dfxp.prettify(formatter=None)
-        return caption_content
+        return _serialize_document(dfxp, self.compact)
 
     @staticmethod
     def _get_region_creator_class():
@@ -318,6 +359,39 @@ class DFXPWriter(BaseWriter):
             if self.write_inline_positioning:
                 tag.attrs.update(attribs)
 
+    def _index_styles(self, dfxp):
+        """Remember the ids of the styles defined in the document, so they
+        don't have to be looked up in the whole document for every caption.
+
+        :type dfxp: BeautifulSoup
+        """
+        self._style_ids = set(
+            style.get(u'xml:id')
+            for style in dfxp.find(u'styling').find_all(u'style')
+        )
+        self._style_attributes = {}
+        self.p_style = u'p' in self._style_ids
+
+    def _get_style_attributes(self, content, dfxp):
+        """Return the DFXP attributes for the given style dict. Captions and
+        spans share a few distinct style dicts, so the result is cached.
+
+        :param content: a dictionary with CSS-like styling rules
+        :type dfxp: BeautifulSoup
+        :rtype: dict
+        """
+        try:
+            key = frozenset(content.items())
+        except TypeError:
+            # Unhashable style values, don't cache
+            return _recreate_style(content, dfxp, self._style_ids)
+
+        attributes = self._style_attributes.get(key)
+        if attributes is None:
+            attributes = _recreate_style(content, dfxp, self._style_ids)
+            self._style_attributes[key] = attributes
+        return attributes
+
     def _recreate_styling_tag(self, style, content, dfxp):
         # TODO - should be drastically simplified: if attributes : append
         dfxp_style = dfxp.new_tag(u'style')
@@ -340,10 +414,10 @@ class DFXPWriter(BaseWriter):
         p = dfxp.new_tag(u"p", begin=start, end=end)
         p.string = self._recreate_text(caption, dfxp, caption_set, lang)
 
-        if dfxp.find(u"style", {u"xml:id": u"p"}):
+        if self.p_style:
             p[u'style'] = u'p'
 
-        p.attrs.update(_recreate_style(caption_style, dfxp))
+        p.attrs.update(self._get_style_attributes(caption_style, dfxp))
 
         return p
 
@@ -355,7 +429,7 @@ class DFXPWriter(BaseWriter):
                 line += self._encode(node.content)
 
             elif node.type_ == CaptionNode.BREAK:
-                line = line.rstrip() + u'<br/>\n    '
+                line = line.rstrip() + self._line_break()
 
             elif node.type_ == CaptionNode.STYLE:
                 line = self._recreate_span(
@@ -363,6 +437,9 @@ class DFXPWriter(BaseWriter):
 
         return line.rstrip()
 
+    def _line_break(self):
+        return _get_line_break(self.compact)
+
     def _recreate_span(self, line, node, dfxp, caption_set=None, caption=None,
                        lang=None):
         # TODO - This method seriously has to go away!
@@ -373,7 +450,8 @@ class DFXPWriter(BaseWriter):
         if node.start:
             styles = u''
 
-            content_with_style = _recreate_style(node.content, dfxp)
+            content_with_style = self._get_style_attributes(
+                node.content, dfxp)
             for style, value in content_with_style.items():
                 styles += u' %s="%s"' % (style, value)
             if node.layout_info:
@@ -433,7 +511,7 @@ class LayoutAwareDFXPParser(BeautifulSoup):
 
     def __init__(self, markup=u"", features=u"html.parser", builder=None,
                  parse_only=None, from_encoding=None,
-                 read_invalid_positioning=False, **kwargs):
+                 read_invalid_positioning=False, languages=None, **kwargs):
         """The `features` param determines the parser to be used. The parsers
         are usually html parsers, some more forgiving than others, and as such
         they do stuff very differently especially for xml files. We chose this
@@ -447,6 +525,9 @@ class LayoutAwareDFXPParser(BeautifulSoup):
             layout info on every element itself (even if the docs explicitly
             call for ignoring attributes, when incorrectly placed)
 
+        :param languages: if given, layout info is only determined for the
+            <div> tags of these languages
+
 
         Check out the docs below for explanation.
         http://www.crummy.com/software/BeautifulSoup/bs4/doc/#installing-a-parser
@@ -457,7 +538,8 @@ class LayoutAwareDFXPParser(BeautifulSoup):
         self.read_invalid_positioning = read_invalid_positioning
 
         for div in self.find_all(u'div'):
-            self._pre_order_visit(div)
+            if languages is None or _get_div_language(div) in languages:
+                self._pre_order_visit(div)
 
     def _pre_order_visit(self, element, inherit_from=None):
         """Process the xml tree elements in pre order by adding a .layout_info
@@ -883,19 +965,25 @@ class RegionCreator(object):
 
         *: NULL means LayoutAwareBeautifulParser.NO_POSITIONING_INFO
     """
-    def __init__(self, dfxp, caption_set):
+    def __init__(self, dfxp, caption_set, precision=None):
         """
         :type dfxp: BeautifulSoup
         :type caption_set: CaptionSet
+        :type precision: int
+        :param precision: If set, layouts are rounded to this number of digits
+            before being compared, so near-identical layouts share a region
         """
         self._dfxp = dfxp
         self._caption_set = caption_set
         self._region_map = {}
         self._id_seed = 0
         self._assigned_region_ids = set()
+        self._precision = precision
+        self._canonical_layouts = {}
 
     @staticmethod
-    def _collect_unique_regions(caption_set, ignore_region):
+    def _collect_unique_regions(caption_set, ignore_region,
+                                canonicalize=None):
         """Iterate through all the nodes in the caption set, and return a list
         of all unique region specs (Layout objects)
 
@@ -904,9 +992,13 @@ class RegionCreator(object):
         result set)
 
         :type caption_set: CaptionSet
+        :param canonicalize: optional callable applied to every layout before
+            checking its uniqueness
         :return: iterable containing the unique regions that will have to
             appear in the document
         """
+        canonicalize = canonicalize or (lambda layout: layout)
+
         # This used to be a set, however since set order depends on the hash,
         # this messed up the tests every time some little detail was added to
         # the Layout class, or its references (which is highly fragile)
@@ -916,15 +1008,15 @@ class RegionCreator(object):
         languages = caption_set.get_languages()
         for lang in languages:
             layout_info = caption_set.get_layout_info(lang)
-            unique_regions.add(layout_info)
+            unique_regions.add(canonicalize(layout_info))
 
             # Get the regions of all the captions.. (the <p> tags)
             for caption in caption_set.get_captions(lang):
-                unique_regions.add(caption.layout_info)
+                unique_regions.add(canonicalize(caption.layout_info))
 
                 # The regions of all the text/br/style nodes
                 for node in caption.nodes:
-                    unique_regions.add(node.layout_info)
+                    unique_regions.add(canonicalize(node.layout_info))
 
         unique_regions.discard(None)
         unique_regions.discard(ignore_region)
@@ -973,7 +1065,7 @@ class RegionCreator(object):
             self._dfxp, lambda: DFXP_DEFAULT_REGION_ID
         )
         unique_regions = self._collect_unique_regions(
-            self._caption_set, DFXP_DEFAULT_REGION)
+            self._caption_set, DFXP_DEFAULT_REGION, self._canonicalize)
 
         # Create the document specified regions
         self._region_map = self._create_unique_regions(
@@ -981,6 +1073,22 @@ class RegionCreator(object):
 
         self._region_map.update(default_region_map)
 
+    def _canonicalize(self, layout):
+        """Return the layout used for looking up the region of `layout`.
+        Unless a precision was given, this is the layout itself.
+
+        :type layout: Layout
+        :rtype: Layout
+        """
+        if not layout or self._precision is None:
+            return layout
+
+        canonical = self._canonical_layouts.get(layout)
+        if canonical is None:
+            canonical = layout.rounded(self._precision)
+            self._canonical_layouts[layout] = canonical
+        return canonical
+
     def _get_new_id(self, prefix=u'r'):
         """Return new, unique ids (use an internal counter).
 
@@ -1029,6 +1137,7 @@ class RegionCreator(object):
             if not layout_info:
                 layout_info = caption_set.layout_info
 
+        layout_info = self._canonicalize(layout_info)
         region_id = self._region_map.get(layout_info)
 
         # Make sure the default region ID/ attributes are always returned
@@ -1059,11 +1168,70 @@ class RegionCreator(object):
                 region.extract()
 
 
-def _recreate_style(content, dfxp):
+def _create_document(markup, compact=False):
+    """Parse the base markup of a document to be written. For compact
+    output, the indentation of the markup is dropped, so that it doesn't end
+    up between the tags of the serialized document.
+
+    :type markup: unicode
+    :type compact: bool
+    :rtype: BeautifulSoup
+    """
+    if compact:
+        markup = re.sub(u'>\s+<', u'><', markup.strip())
+    return BeautifulSoup(markup, u'xml')
+
+
+def _get_line_break(compact=False):
+    """Return the line break written between the lines of a caption. In a
+    compact document, it isn't followed by a new line.
+
+    :type compact: bool
+    :rtype: unicode
+    """
+    return DFXP_COMPACT_LINE_BREAK if compact else DFXP_LINE_BREAK
+
+
+def _serialize_document(dfxp, compact=False):
+    """Return the unicode representation of the document, either prettified
+    (one tag per line, indented) or compact (no whitespace between tags)
+
+    :type dfxp: BeautifulSoup
+    :type compact: bool
+    :rtype: unicode
+    """
+    if compact:
+        return dfxp.decode(formatter=None)
+    return dfxp.prettify(formatter=None)
+
+
+def _get_div_language(div):
+    """Return the language of the captions contained in a <div> tag
+
+    :param div: BeautifulSoup Tag
+    :rtype: unicode
+    """
+    return div.attrs.get(u'xml:lang', DEFAULT_LANGUAGE_CODE)
+
+
+def _recreate_style(content, dfxp, style_ids=None):
+    """Convert a dictionary with CSS-like styling rules to DFXP attributes
+
+    :param content: a dictionary with CSS-like styling rules
+    :type dfxp: BeautifulSoup
+    :param style_ids: the ids of the styles defined in the document. If not
+        given, the document is searched for the referenced style.
+    :rtype: dict
+    """
     dfxp_style = {}
 
     if u'class' in content:
-        if dfxp.find(u"style", {u"xml:id": content[u'class']}):
+        if style_ids is not None:
+            style_exists = content[u'class'] in style_ids
+        else:
+            style_exists = dfxp.find(
+                u"style", {u"xml:id": content[u'class']})
+        if style_exists:
             dfxp_style[u'style'] = content[u'class']
     if u'text-align' in content:
         dfxp_style[u'tts:textAlign'] = content[u'text-align']
@@ -1246,13 +1414,22 @@ def _convert_layout_to_attributes(layout):
 
 
 class _OrderedSet(list):
-    """Quick implementation of a set that tracks the order. If this is a
-    performance bottleneck, replace it with some other implementation.
+    """Quick implementation of a set that tracks the order. Membership is
+    checked against a companion set, so adding is O(1) for hashable objects.
     """
+    def __init__(self, *args, **kwargs):
+        super(_OrderedSet, self).__init__(*args, **kwargs)
+        self._members = set(self)
+
+    def __contains__(self, item):
+        return item in self._members
+
     def add(self, p_object):
         if p_object not in self:
             super(_OrderedSet, self).append(p_object)
+            self._members.add(p_object)
 
     def discard(self, value):
         if value in self:
             super(_OrderedSet, self).remove(value)
+            self._members.discard(value)
@@ -1,13 +1,14 @@
 # We thought about making pycaption.base objects immutable. This would be nice
 # in a lot of cases, but since the transformations on them could be quite
-# complex, the deepcopy method is good enough sometimes.
-from copy import deepcopy
-
-from .base import DFXPWriter, DFXP_DEFAULT_REGION
-from ..base import BaseWriter, CaptionNode, merge_concurrent_captions
+# complex, the writers below work on shallow copies instead: new CaptionSets,
+# Captions and CaptionNodes, sharing the (unchanged) content of the original.
+from .base import (
+    DFXPWriter, DFXP_DEFAULT_REGION, _create_document, _get_line_break,
+    _serialize_document)
+from ..base import (
+    BaseWriter, CaptionSet, CaptionNode, merge_concurrent_captions)
 
 from xml.sax.saxutils import escape
-from bs4 import BeautifulSoup
 
 LEGACY_DFXP_BASE_MARKUP = u'''
 <tt xmlns="http://www.w3.org/ns/ttml"
@@ -53,7 +54,9 @@ class SinglePositioningDFXPWriter(DFXPWriter):
         captions_set = self._create_single_positioning_caption_set(
             captions_set, self.default_positioning)
 
-        return super(SinglePositioningDFXPWriter, self).write(captions_set, force)  # noqa
+        # The caption set was created above and isn't shared with the caller,
+        # so there's no need for the base writer to copy it again
+        return self._write(captions_set, force)
 
     @staticmethod
     def _create_single_positioning_caption_set(caption_set, positioning):
@@ -66,9 +69,10 @@ class SinglePositioningDFXPWriter(DFXPWriter):
         # If SinglePositioningDFXPWriter would modify the state of the caption
         # set, any writer using the same caption_set thereafter would be
         # affected. At the moment we know we don't use any other writers, but
-        # this is important and mustn't be neglected
-        caption_set = deepcopy(caption_set)
-        caption_set = merge_concurrent_captions(caption_set)
+        # this is important and mustn't be neglected. Merging the concurrent
+        # captions creates new Caption objects, and the nodes are replaced
+        # with copies, so the original caption set is never modified.
+        caption_set = merge_concurrent_captions(_shallow_copy(caption_set))
         caption_set.layout_info = positioning
 
         for lang in caption_set.get_languages():
@@ -77,28 +81,35 @@ class SinglePositioningDFXPWriter(DFXPWriter):
             caption_list = caption_set.get_captions(lang)
             for caption in caption_list:
                 caption.layout_info = positioning
+                caption.nodes = [
+                    _copy_node(node, positioning) for node in caption.nodes]
 
-                for node in caption.nodes:
-                    if hasattr(node, 'layout_info'):
-                        node.layout_info = positioning
-
-        for _, style in caption_set.get_styles():
-            if 'text-align' in style:
-                style.pop('text-align')
+        caption_set.set_styles(dict(
+            (style_id, dict(
+                (attr, value) for attr, value in style.items()
+                if attr != 'text-align'
+            ))
+            for style_id, style in caption_set.get_styles()
+        ))
 
         return caption_set
 
 class LegacyDFXPWriter(BaseWriter):
     """Ported the legacy DFXPWriter from 0.4.5"""
-    def __init__(self, *args, **kw):
+    def __init__(self, *args, **kwargs):
+        """
+        :param compact: If True, the output is not prettified (see
+            DFXPWriter)
+        """
         self.p_style = False
         self.open_span = False
+        self.compact = kwargs.pop(u'compact', False)
+        super(LegacyDFXPWriter, self).__init__(*args, **kwargs)
 
     def write(self, caption_set, force=u''):
-        caption_set = deepcopy(caption_set)
-        caption_set = merge_concurrent_captions(caption_set)
+        caption_set = merge_concurrent_captions(_shallow_copy(caption_set))
 
-        dfxp = BeautifulSoup(LEGACY_DFXP_BASE_MARKUP, u'xml')
+        dfxp = _create_document(LEGACY_DFXP_BASE_MARKUP, self.compact)
         dfxp.find(u'tt')[u'xml:lang'] = u"en"
 
         for style_id, style in caption_set.get_styles():
@@ -126,7 +137,7 @@ class LegacyDFXPWriter(BaseWriter):
 
             for caption in caption_set.get_captions(lang):
                 if caption.style:
-                    caption_style = caption.style
+                    caption_style = dict(caption.style)
                     caption_style.update({u'region': LEGACY_DFXP_DEFAULT_REGION_ID})
                 else:
                     caption_style = {u'class': LEGACY_DFXP_DEFAULT_STYLE_ID,
@@ -136,8 +147,7 @@ class LegacyDFXPWriter(BaseWriter):
 
             body.append(div)
 
-        caption_content = dfxp.prettify(formatter=None)
-        return caption_content
+        return _serialize_document(dfxp, self.compact)
 
     # force the DFXP to only have one language, trying to match on "force"
     def _force_language(self, force, langs):
@@ -195,7 +205,7 @@ class LegacyDFXPWriter(BaseWriter):
                 line += escape(node.content) + u' '
 
             elif node.type_ == CaptionNode.BREAK:
-                line = line.rstrip() + u'<br/>\n    '
+                line = line.rstrip() + _get_line_break(self.compact)
 
             elif node.type_ == CaptionNode.STYLE:
                 line = self._recreate_span(line, node, dfxp)
@@ -245,3 +255,38 @@ class LegacyDFXPWriter(BaseWriter):
             dfxp_style[u'tts:displayAlign'] = content[u'display-align']
 
         return dfxp_style
+
+
+def _shallow_copy(caption_set):
+    """Return a new CaptionSet with the same captions, styles and layout
+    information as the given one. The new set can be rearranged (e.g. by
+    merge_concurrent_captions) without affecting the original one, as long as
+    the captions themselves aren't modified.
+
+    :type caption_set: pycaption.base.CaptionSet
+    :rtype: pycaption.base.CaptionSet
+    """
+    new_caption_set = CaptionSet()
+    new_caption_set.layout_info = caption_set.layout_info
+    new_caption_set.set_styles(dict(caption_set.get_styles()))
+
+    for lang in caption_set.get_languages():
+        new_caption_set.set_captions(
+            lang, list(caption_set.get_captions(lang)))
+        new_caption_set.set_layout_info(
+            lang, caption_set.get_layout_info(lang))
+
+    return new_caption_set
+
+
+def _copy_node(node, layout_info):
+    """Return a copy of the CaptionNode, positioned with `layout_info`
+
+    :type node: pycaption.base.CaptionNode
+    :type layout_info: pycaption.geometry.Layout
+    :rtype: pycaption.base.CaptionNode
+    """
+    new_node = CaptionNode(node.type_, layout_info=layout_info)
+    new_node.content = node.content
+    new_node.start = node.start
+    return new_node
@@ -237,6 +237,15 @@ class Stretch(TwoDimensionalObject):
             self.vertical.as_percentage_of(video_height=video_height)
         )
 
+    def rounded(self, precision):
+        """
+        Returns a Stretch with both dimensions rounded to `precision` digits
+        """
+        return Stretch(
+            self.horizontal.rounded(precision),
+            self.vertical.rounded(precision)
+        )
+
 
 class Region(object):
     """Represents the spatial coordinates of a rectangle
@@ -363,6 +372,12 @@ class Point(TwoDimensionalObject):
             self.y.as_percentage_of(video_height=video_height)
         )
 
+    def rounded(self, precision):
+        """
+        Returns a Point with both coordinates rounded to `precision` digits
+        """
+        return Point(self.x.rounded(precision), self.y.rounded(precision))
+
     @classmethod
     def align_from_origin(cls, p1, p2):
         """Returns a tuple of 2 points. The first is closest to the origin
@@ -510,6 +525,15 @@ class Size(object):
 
         return Size(value, unit)
 
+    def rounded(self, precision):
+        """
+        Returns a Size with the value rounded to `precision` digits. Used for
+        telling apart sizes that only differ by rounding artefacts.
+
+        :type precision: int
+        """
+        return Size(round(self.value, precision), self.unit)
+
     @classmethod
     # TODO - this also looks highly cachable. Should use a WeakValueDict here
     # to return flyweights
@@ -730,6 +754,19 @@ class Padding(object):
             self.end.as_percentage_of(video_width=video_width)
         )
 
+    def rounded(self, precision):
+        """
+        Returns a Padding with its four sizes rounded to `precision` digits
+
+        :type precision: int
+        """
+        return Padding(
+            self.before.rounded(precision),
+            self.after.rounded(precision),
+            self.start.rounded(precision),
+            self.end.rounded(precision)
+        )
+
     def is_relative(self):
         is_relative = True
         if self.before:
@@ -862,6 +899,24 @@ class Layout(object):
                                                           video_height)
         return Layout(**params)
 
+    def rounded(self, precision):
+        """
+        Returns a Layout with all its sizes rounded to `precision` digits, so
+        that layouts which only differ by rounding artefacts (e.g. 53.333%
+        and 53.33%) become equal.
+
+        :type precision: int
+        """
+        params = {
+            'alignment': self.alignment,
+            'webvtt_positioning': self.webvtt_positioning
+        }
+        for attr_name in ['origin', 'extent', 'padding']:
+            attr = getattr(self, attr_name)
+            if attr:
+                params[attr_name] = attr.rounded(precision)
+        return Layout(**params)
+
     def fit_to_screen(self):
         """
         If extent is not set or if origin + extent > 100%, (re)calculate it
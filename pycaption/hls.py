@@ -0,0 +1,114 @@
+from math import ceil
+
+from .webvtt import WebVTTWriter
+
+
+class HLSWebVTTWriter(WebVTTWriter):
+    """
+    Cuts the captions into WebVTT segments of a fixed duration, as needed for
+    HTTP Live Streaming, and writes the media playlist listing them.
+
+    The cues keep their timing: each segment maps the start of the captions
+    to the MPEG-TS timestamp of the video with an X-TIMESTAMP-MAP header, and
+    a cue straddling the end of a segment is written in every segment it
+    overlaps.
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        :param segment_duration: the duration of the segments, in seconds
+        :param mpegts: the MPEG-TS timestamp (in 90kHz units) of the start of
+            the captions
+        :param segment_name: the format of the names of the segments, given
+            their index
+        :param playlist_name: the name of the playlist
+        """
+        self.segment_duration = kwargs.pop(u'segment_duration', 10)
+        self.mpegts = kwargs.pop(u'mpegts', 0)
+        self.segment_name = kwargs.pop(u'segment_name', u'segment{}.vtt')
+        self.playlist_name = kwargs.pop(u'playlist_name', u'playlist.m3u8')
+        if self.segment_duration <= 0:
+            raise ValueError(u'The segment duration must be positive.')
+        super(HLSWebVTTWriter, self).__init__(*args, **kwargs)
+
+    def write_segments(self, caption_set, duration=None):
+        """
+        Walk the captions once in order of start, returning each segment as
+        soon as it's complete, so that only the text of the cues of one
+        segment is held in memory (the captions are still all sorted first).
+
+        The segments define no regions, so the cues always carry their cue
+        settings, even if use_regions is set.
+
+        :type caption_set: CaptionSet
+        :param duration: the duration of the video, in seconds. By default,
+            the segments go until the end of the last caption.
+        :returns: generator of (name, content) tuples: the segments in order,
+            then the playlist
+        """
+        target_duration = int(ceil(self.segment_duration))
+        playlist = [
+            u'#EXTM3U',
+            u'#EXT-X-VERSION:3',
+            u'#EXT-X-TARGETDURATION:{}'.format(target_duration),
+            u'#EXT-X-MEDIA-SEQUENCE:0',
+            u'#EXT-X-PLAYLIST-TYPE:VOD',
+        ]
+
+        segments = self._iter_segments(
+            caption_set, int((duration or 0) * 1000000))
+        for index, (length, cues) in enumerate(segments):
+            name = self.segment_name.format(index)
+            yield name, self._write_segment(cues)
+
+            playlist.append(u'#EXTINF:{:.3f},'.format(length / 1000000.0))
+            playlist.append(name)
+
+        playlist.append(u'#EXT-X-ENDLIST')
+        yield self.playlist_name, u'\n'.join(playlist) + u'\n'
+
+    def _iter_segments(self, caption_set, end):
+        """
+        :param end: the end of the last segment, in microseconds, unless the
+            captions go further
+        :returns: generator of (duration, cues) tuples, the duration in
+            microseconds and the cues as WebVTT text
+        """
+        segment_duration = int(self.segment_duration * 1000000)
+        # The cues must not reference the regions of a document written before
+        self._cue_settings = {}
+        self._region_cue_settings = {}
+        captions = []
+        if not caption_set.is_empty():
+            lang = self._get_language(caption_set)
+            self.global_layout = caption_set.get_layout_info(lang)
+            captions = sorted(
+                caption_set.get_captions(lang), key=lambda c: c.start)
+
+        segment_start = 0
+        # The end and text of the cues overlapping the current segment
+        cues = []
+        for caption in captions:
+            while caption.start >= segment_start + segment_duration:
+                yield segment_duration, [text for _, text in cues]
+                segment_start += segment_duration
+                cues = [cue for cue in cues if cue[0] > segment_start]
+            cues.append((caption.end, self._write_caption(caption)))
+            end = max(end, caption.end)
+
+        while cues or segment_start < end:
+            length = min(segment_duration, end - segment_start)
+            yield (length if length > 0 else segment_duration,
+                   [text for _, text in cues])
+            segment_start += segment_duration
+            cues = [cue for cue in cues if cue[0] > segment_start]
+
+    def _write_segment(self, cues):
+        """
+        :param cues: list of cues as WebVTT text
+        :rtype: unicode
+        """
+        header = (
+            u'WEBVTT\nX-TIMESTAMP-MAP=MPEGTS:{},LOCAL:00:00:00.000\n\n'.format(
+                self.mpegts)
+        )
+        return header + u'\n'.join(cues)
@@ -37,14 +37,15 @@ OBS:
 """
 import re
 
-from collections import deque
+from bisect import bisect_left, bisect_right
+from collections import deque, defaultdict
 from htmlentitydefs import name2codepoint
+from multiprocessing import Pool
 from HTMLParser import HTMLParser, HTMLParseError
 from logging import FATAL
 from xml.sax.saxutils import escape
-from copy import deepcopy
+from io import StringIO
 
-from cssutils import parseString, log, css as cssutils_css
 from bs4 import BeautifulSoup, NavigableString
 
 from .base import (
@@ -57,23 +58,20 @@ from .geometry import (
 )
 
 
-# change cssutils default logging
-log.setLevel(FATAL)
-
-
-SAMI_BASE_MARKUP = u'''
-<sami>
-    <head>
-        <style type="text/css"/>
-    </head>
-    <body/>
-</sami>'''
-
-
 class SAMIReader(BaseReader):
     def __init__(self, *args, **kw):
+        """
+        :param single_pass: If True, the captions are built directly from the
+            events of the SAMI parser, skipping the normalized document and
+            its re-parsing with BeautifulSoup
+        :param processes: If more than 1, the body is split in this many
+            chunks of SYNC blocks, which are parsed in parallel by a pool of
+            processes
+        """
         self.line = []
         self.first_alignment = None
+        self.single_pass = kw.get('single_pass', False)
+        self.processes = kw.get('processes', 1)
 
     def detect(self, content):
         if u'<sami' in content.lower():
@@ -81,13 +79,24 @@ class SAMIReader(BaseReader):
         else:
             return False
 
-    def read(self, content):
+    def read(self, content, languages=None):
+        """
+        :type content: unicode
+        :param languages: If given, only the captions in these languages are
+            read. The paragraphs of other languages are not translated.
+        :rtype: CaptionSet
+        """
         if type(content) != unicode:
             raise InvalidInputError('The content is not a unicode string.')
 
-        content, doc_styles, doc_langs = (
-            self._get_sami_parser_class()().feed(content))
-        sami_soup = self._get_xml_parser_class()(content)
+        chunks = self._split_in_chunks(content)
+        if len(chunks) > 1:
+            doc_styles, doc_langs, paragraphs = self._translate_chunks(
+                chunks, languages)
+        else:
+            doc_styles, doc_langs, paragraphs = self._translate_document(
+                content, languages)
+
         caption_set = CaptionSet()
         caption_set.set_styles(doc_styles)
         # Get the global layout that applies to all <p> tags
@@ -95,31 +104,239 @@ class SAMIReader(BaseReader):
         caption_set.layout_info = layout_info
 
         for language in doc_langs:
-            lang_layout = None
-            for target, styling in doc_styles.items():
-                if target not in [u'p', u'sync', u'span']:
-                    if styling.get(u'lang', None) == language:
-                        lang_layout = self._build_layout(
-                            doc_styles.get(target, {}),
-                            inherit_from=layout_info
-                        )
-                        break
-            lang_layout = lang_layout or layout_info
-            caption_set.set_layout_info(language, lang_layout)
-            lang_captions = self._translate_lang(
-                language, sami_soup, lang_layout)
-            caption_set.set_captions(language, lang_captions)
+            if language not in paragraphs:
+                continue
+            caption_set.set_layout_info(
+                language,
+                self._build_lang_layout(language, doc_styles, layout_info)
+            )
+            caption_set.set_captions(
+                language, self._set_end_times(paragraphs[language]))
 
         if caption_set.is_empty():
             raise CaptionReadNoCaptions(u"empty caption file")
 
         return caption_set
 
+    def iter_captions(self, source, languages=None):
+        """
+        Read the captions of a SAMI document incrementally, keeping in memory
+        little more than the SYNC block being read, so that very large files
+        can be read.
+
+        Unlike read(), each <p> tag only belongs to the language detected for
+        it, and the stylesheet has to be in the head (which is read first).
+
+        :param source: unicode string, or file-like object whose read()
+            returns unicode strings (e.g. opened with io.open)
+        :param languages: If given, only the captions in these languages are
+            read.
+        :returns: generator of (language, Caption) tuples. Every caption is
+            yielded as soon as its end time is known, so the captions of a
+            language come in order.
+        """
+        parser = self._get_sami_paragraph_parser_class()()
+        layouts = {}
+        timers = {}
+        # The last <p> tag read may still be incomplete
+        pending = []
+        found_captions = False
+
+        for complete in self._feed_in_chunks(parser, source):
+            paragraphs = pending + parser.paragraphs
+            parser.paragraphs = []
+            if not complete:
+                pending = paragraphs[-1:]
+                paragraphs = paragraphs[:-1]
+
+            for milliseconds, p in paragraphs:
+                language = p.language
+                if languages is not None and language not in languages:
+                    continue
+                if language not in layouts:
+                    layout_info = self._build_layout(
+                        parser.styles.get('p', {}))
+                    layouts[language] = self._build_lang_layout(
+                        language, parser.styles, layout_info)
+                    timers[language] = _CaptionTimer()
+                caption = self._translate_paragraph(
+                    milliseconds, p, layouts[language])
+
+                for caption in timers[language].add(milliseconds, caption):
+                    found_captions = True
+                    yield language, caption
+
+        for language in parser.lang_order:
+            if language in timers:
+                for caption in timers[language].close():
+                    found_captions = True
+                    yield language, caption
+
+        if not found_captions:
+            raise CaptionReadNoCaptions(u"empty caption file")
+
+    def _feed_in_chunks(self, parser, source):
+        """
+        Feed a SAMI document to the parser a chunk at a time. The head is
+        buffered until the styles can be parsed from it, and the markup fixes
+        are applied to each chunk without ever splitting what they replace.
+
+        :type parser: SAMIParser
+        :param source: unicode string or file-like object
+        :returns: generator yielding False after each chunk fed, and True
+            once the whole document was fed and the tags closed
+        """
+        head = []
+        # Ends of the previous chunk, which the next one may complete
+        lower_tail = u''
+        markup_tail = u''
+
+        for chunk in _read_in_chunks(source):
+            if type(chunk) != unicode:
+                raise InvalidInputError(
+                    'The content is not a unicode string.')
+            lower_chunk = lower_tail + chunk.lower()
+            parser._check_content(lower_chunk)
+            lower_tail = lower_chunk[-len(_NO_CC):]
+
+            if head is not None:
+                head.append(chunk)
+                chunk = u''.join(head)
+                lower_head = chunk.lower()
+                index = lower_head.find(u'</head>')
+                if index == -1:
+                    index = lower_head.find(u'<sync')
+                    if index == -1:
+                        continue
+                parser._parse_styles(chunk[:index])
+                head = None
+
+            markup = markup_tail + chunk
+            cut = len(markup)
+            for size in range(min(len(markup), 3), 0, -1):
+                if any(fixed.startswith(markup[-size:])
+                       for fixed in [u'<i/>', u';>']):
+                    cut -= size
+                    break
+            markup_tail = markup[cut:]
+            parser._feed_markup(parser._fix_markup(markup[:cut]))
+            yield False
+
+        if head is not None:
+            head = u''.join(head)
+            parser._parse_styles(head[:head.lower().find(u'</head>')])
+            markup_tail += head
+        parser._feed_markup(parser._fix_markup(markup_tail))
+        parser._close_all_tags()
+        yield True
+
+    def _translate_document(self, content, languages=None):
+        """
+        Parse a SAMI document and translate its <p> tags to captions, whose
+        end times are set later on by _set_end_times.
+
+        :type content: unicode
+        :param languages: If given, only the <p> tags in these languages are
+            translated.
+        :returns: tuple (dict, list, dict) with the styles, the languages in
+            the order they first appear and, by language, the list of (start,
+            Caption) tuples of its <p> tags, in document order. The Caption is
+            None for empty <p> tags.
+        """
+        if self.single_pass:
+            parser = self._get_sami_paragraph_parser_class()()
+            paragraphs, doc_styles, _ = parser.feed(content)
+        else:
+            parser = self._get_sami_parser_class()()
+            content, doc_styles, _ = parser.feed(content)
+            sami_soup = self._get_xml_parser_class()(content)
+        doc_langs = parser.lang_order
+        layout_info = self._build_layout(doc_styles.get('p', {}))
+
+        lang_paragraphs = {}
+        for language in doc_langs:
+            if languages is not None and language not in languages:
+                continue
+            lang_layout = self._build_lang_layout(
+                language, doc_styles, layout_info)
+            if self.single_pass:
+                selected = [(start, p) for start, p in paragraphs
+                            if _has_language(p, language)]
+            else:
+                selected = self._select_paragraphs(language, sami_soup)
+            lang_paragraphs[language] = [
+                (start, self._translate_paragraph(start, p, lang_layout))
+                for start, p in selected
+            ]
+
+        return doc_styles, doc_langs, lang_paragraphs
+
+    def _split_in_chunks(self, content):
+        """
+        Split the document in (at most) self.processes chunks, each one made
+        of the head and a series of consecutive SYNC blocks.
+
+        :type content: unicode
+        :rtype: list
+        """
+        if not self.processes or self.processes < 2:
+            return [content]
+
+        head_end = content.lower().find(u'</head>')
+        syncs = [match.start() for match in
+                 _SYNC_START_PATTERN.finditer(content, max(head_end, 0))]
+        if len(syncs) < 2:
+            return [content]
+
+        head = content[:syncs[0]]
+        chunk_size = -(-len(syncs) // self.processes)
+        boundaries = syncs[::chunk_size] + [len(content)]
+        return [head + content[start:end]
+                for start, end in zip(boundaries, boundaries[1:])]
+
+    def _translate_chunks(self, chunks, languages=None):
+        """
+        Translate the chunks of a document in a pool of processes, and put
+        the results back together as _translate_document would have returned
+        them for the whole document.
+
+        :type chunks: list
+        :param languages: If given, only the <p> tags in these languages are
+            translated.
+        """
+        pool = Pool(min(self.processes, len(chunks)))
+        try:
+            results = pool.map(
+                _translate_sami_chunk,
+                [(self, chunk, languages) for chunk in chunks]
+            )
+        finally:
+            pool.close()
+            pool.join()
+
+        doc_styles = results[0][0]
+        doc_langs = []
+        lang_paragraphs = {}
+        for _, chunk_langs, chunk_paragraphs in results:
+            # The languages in the order they first appear in the document
+            for language in chunk_langs:
+                if language not in doc_langs:
+                    doc_langs.append(language)
+            for language, paragraphs in chunk_paragraphs.items():
+                lang_paragraphs.setdefault(language, []).extend(paragraphs)
+
+        return doc_styles, doc_langs, lang_paragraphs
+
     @staticmethod
     def _get_sami_parser_class():
         """Hook method for providing custom SAMIParser classes"""
         return SAMIParser
 
+    @staticmethod
+    def _get_sami_paragraph_parser_class():
+        """Hook method for providing custom SAMIParagraphParser classes"""
+        return SAMIParagraphParser
+
     @staticmethod
     def _get_xml_parser_class():
         """Hook method for providing a custom XML parser class"""
@@ -151,6 +368,20 @@ class SAMIReader(BaseReader):
         """Hook method for providing a custom Layout class"""
         return Layout
 
+    def _build_lang_layout(self, language, doc_styles, layout_info):
+        """
+        Return the Layout of a language, from the style with its lang, or the
+        global layout_info if there's no such style.
+        """
+        for target, styling in doc_styles.items():
+            if target not in [u'p', u'sync', u'span']:
+                if styling.get(u'lang', None) == language:
+                    return self._build_layout(
+                        doc_styles.get(target, {}),
+                        inherit_from=layout_info
+                    )
+        return layout_info
+
     def _get_padding(self, styles):
         margin_before = self._get_size(styles, 'margin-top')
         margin_after = self._get_size(styles, 'margin-bottom')
@@ -171,53 +402,66 @@ class SAMIReader(BaseReader):
             return None
         return Size.from_string(value_from_style)
 
-    def _translate_lang(self, language, sami_soup, parent_layout):
+    def _select_paragraphs(self, language, sami_soup):
+        """
+        Return the <p> tags of a language, as a list of (start, p) tuples,
+        where start is the start time (in milliseconds) of the SYNC tag
+        containing the p tag.
+        """
+        return [
+            (int(float(p.parent[u'start'])), p)
+            for p in sami_soup.select(u'p[lang|=%s]' % language)
+        ]
+
+    def _translate_paragraph(self, milliseconds, p, parent_layout):
         """
-        For a given language, translate the SAMI XML to internal list of
-        captions.
+        Translate a <p> tag to a Caption, without its end time.
 
+        :param milliseconds: the start of the SYNC tag containing the p tag
+        :rtype: Caption or None (if the p tag has no text)
+        """
+        if not p.get_text().strip():
+            return None
+
+        self.first_alignment = None
+        styles = self._translate_attrs(p)
+        layout_info = self._build_layout(styles, inherit_from=parent_layout)
+        self.line = []
+
+        self._translate_tag(p, layout_info)
+        caption_layout = self._get_layout_class()(
+            alignment=self.first_alignment,
+            inherit_from=layout_info
+        )
+        caption = Caption(layout_info=caption_layout)
+        for node in self.line:
+            node.layout_info = Layout(
+                alignment=self.first_alignment,
+                inherit_from=node.layout_info
+            )
+        self.first_alignment = None
+
+        caption.start = milliseconds * 1000
+        caption.end = 0
+        caption.nodes = self.line
+        caption.style = styles
+        return caption
+
+    def _set_end_times(self, paragraphs):
+        """
+        Each caption ends when the next <p> tag of its language (empty or
+        not) starts.
+
+        :param paragraphs: list of (start, Caption) tuples, as returned by
+            _translate_document
         :rtype: list
         """
+        timer = _CaptionTimer()
         captions = []
-        milliseconds = 0
-
-        for p in sami_soup.select(u'p[lang|=%s]' % language):
-            milliseconds = int(float(p.parent[u'start']))
-            start = milliseconds * 1000
-            end = 0
-
-            if captions != [] and captions[-1].end == 0:
-                captions[-1].end = milliseconds * 1000
-
-            if p.get_text().strip():
-                self.first_alignment = None
-                styles = self._translate_attrs(p)
-                layout_info = self._build_layout(styles,
-                                                 inherit_from=parent_layout)
-                self.line = []
-
-                self._translate_tag(p, layout_info)
-                caption_layout = self._get_layout_class()(
-                    alignment=self.first_alignment,
-                    inherit_from=layout_info
-                )
-                caption = Caption(layout_info=caption_layout)
-                for node in self.line:
-                    node.layout_info = Layout(
-                        alignment=self.first_alignment,
-                        inherit_from=node.layout_info
-                    )
-                self.first_alignment = None
 
-                caption.start = start
-                caption.end = end
-                caption.nodes = self.line
-                caption.style = styles
-                captions.append(caption)
-
-        if captions and captions[-1].end == 0:
-            # Arbitrarily make this last 4 seconds. Not ideal...
-            captions[-1].end = (milliseconds + 4000) * 1000
+        for milliseconds, caption in paragraphs:
+            captions.extend(timer.add(milliseconds, caption))
+        captions.extend(timer.close())
 
         return captions
 
@@ -307,6 +551,8 @@ class SAMIReader(BaseReader):
                 attrs[u'font-size'] = value.strip()
             elif css_property == u'font-style' and value.strip() == u'italic':
                 attrs[u'italics'] = True
+            elif css_property in (u'font-weight', u'text-decoration'):
+                attrs[css_property] = value.strip()
             elif css_property == u'lang':
                 attrs[u'lang'] = value.strip()
             elif css_property == u'color':
@@ -345,15 +591,32 @@ class SAMIWriter(BaseWriter):
         super(SAMIWriter, self).__init__(*args, **kwargs)
         self.open_span = False
         self.last_time = None
+        self.syncs = _SyncIndex()
 
     def write(self, caption_set):
-        caption_set = deepcopy(caption_set)
-        sami = BeautifulSoup(SAMI_BASE_MARKUP, u"xml")
+        output = StringIO()
+        self.write_to(caption_set, output)
+        return output.getvalue()
+
+    def write_to(self, caption_set, fp):
+        """
+        Writes the SAMI document straight to a file-like object, without
+        building a BeautifulSoup tree of it.
+
+        :type caption_set: CaptionSet
+        :param fp: file-like object the unicode markup is written to
+        """
+        caption_set = _copy_layouts_and_styles(caption_set)
+        self.syncs = _SyncIndex()
 
         caption_set.layout_info = self._relativize_and_fit_to_screen(
             caption_set.layout_info)
 
         primary = None
+        # The layouts of the captions/nodes aren't written, but they still
+        # have to be valid for the provided or default settings. Documents
+        # share a handful of layouts, so each is only checked once.
+        checked_layouts = set([None])
 
         for lang in caption_set.get_languages():
             self.last_time = None
@@ -367,47 +630,57 @@ class SAMIWriter(BaseWriter):
             )
 
             for caption in caption_set.get_captions(lang):
-                # Loop through all captions/nodes and apply transformations to
-                # layout in function of the provided or default settings
-                caption.layout_info = self._relativize_and_fit_to_screen(
-                    caption.layout_info)
+                self._check_layout(caption.layout_info, checked_layouts)
                 for node in caption.nodes:
-                    node.layout_info = self._relativize_and_fit_to_screen(
-                        node.layout_info)
-                sami = self._recreate_p_tag(
-                    caption, sami, lang, primary, caption_set)
+                    self._check_layout(node.layout_info, checked_layouts)
+                self._recreate_p_tag(caption, lang, primary, caption_set)
 
         stylesheet = self._recreate_stylesheet(caption_set)
-        sami.find(u'style').append(stylesheet)
 
-        a = sami.prettify(formatter=None).split(u'\n')
-        caption_content = u'\n'.join(a[1:])
-        return caption_content
+        # The markup is indented like BeautifulSoup's prettify() does it
+        fp.write(u'<sami>\n <head>\n  <style type="text/css">\n')
+        fp.write(u'   %s\n' % stylesheet.strip())
+        fp.write(u'  </style>\n </head>\n')
+        if self.syncs.is_empty():
+            fp.write(u' <body/>\n')
+        else:
+            fp.write(u' <body>\n')
+            for sync in self.syncs:
+                fp.write(sync.render())
+            fp.write(u' </body>\n')
+        fp.write(u'</sami>')
+
+    def _check_layout(self, layout_info, checked_layouts):
+        """
+        Relativizes and fits the layout to the screen, unless a layout equal
+        to it already was, only to raise the errors doing so can raise.
 
-    def _recreate_p_tag(self, caption, sami, lang, primary, captions):
+        :type layout_info: Layout
+        :param checked_layouts: set of the layouts already checked, updated
         """
-        Creates a p tag for the given caption, attach it to the sami object
-        and return it.
+        if layout_info not in checked_layouts:
+            self._relativize_and_fit_to_screen(layout_info)
+            checked_layouts.add(layout_info)
+
+    def _recreate_p_tag(self, caption, lang, primary, captions):
+        """
+        Creates a p tag for the given caption and attach it to its sync tag.
 
         :type caption: Caption
-        :type sami: BeautifulSoup
         :type lang: unicode
         :type primary: unicode
         :type captions: CaptionSet
-
-        :rtype: BeautifulSoup
         """
         time = caption.start / 1000
 
         if self.last_time and time != self.last_time:
-            sami = self._recreate_blank_tag(
-                sami, caption, lang, primary, captions)
+            self._recreate_blank_tag(caption, lang, primary, captions)
 
         self.last_time = caption.end / 1000
 
-        sami, sync = self._recreate_sync(sami, lang, primary, time)
+        sync = self._recreate_sync(lang, primary, time)
 
-        p = sami.new_tag(u"p")
+        p = {}
 
         p_style = u''
         for attr, value in self._recreate_style(caption.style).items():
@@ -416,61 +689,41 @@ class SAMIWriter(BaseWriter):
             p[u'p_style'] = p_style
 
         p[u'class'] = self._recreate_p_lang(caption, lang, captions)
-        p.string = self._recreate_text(caption.nodes)
-
-        sync.append(p)
 
-        return sami
+        sync.append(p, self._recreate_text(caption.nodes))
 
-    def _recreate_sync(self, sami, lang, primary, time):
+    def _recreate_sync(self, lang, primary, time):
         """
         Creates a sync tag for a given language and timing (if it doesn't
-        already exist), attach it to the sami body and return the sami
-        BeautifulSoupobject.
+        already exist), add it to the sync index and return it.
 
-        :type sami: BeautifulSoup
         :type lang: unicode
         :type primary: unicode
         :type time: int
 
-        :rtype: BeautifulSoup
+        :rtype: _SAMISync
         """
         if lang == primary:
-            sync = sami.new_tag(u"sync", start=u"%s" % time)
-            sami.body.append(sync)
+            sync = _SAMISync(time)
+            self.syncs.append(time, sync)
         else:
-            sync = sami.find(u"sync", start=u"%s" % time)
+            sync = self.syncs.find(time)
             if sync is None:
-                sami, sync = self._find_closest_sync(sami, time)
+                sync = self._find_closest_sync(time)
 
-        return sami, sync
+        return sync
 
-    def _find_closest_sync(self, sami, time):
-        sync = sami.new_tag(u"sync", start=u"%s" % time)
+    def _find_closest_sync(self, time):
+        sync = _SAMISync(time)
+        self.syncs.insert(time, sync)
+        return sync
 
-        earlier = sami.find_all(u"sync", start=lambda x: int(x) < time)
-        if earlier:
-            last_sync = earlier[-1]
-            last_sync.insert_after(sync)
-        else:
-            def later_syncs(start):
-                return int(start) > time
-            later = sami.find_all(u"sync", start=later_syncs)
-            if later:
-                last_sync = later[0]
-                last_sync.insert_before(sync)
-        return sami, sync
-
-    def _recreate_blank_tag(self, sami, caption, lang, primary, captions):
-        sami, sync = self._recreate_sync(sami, lang, primary, self.last_time)
-
-        p = sami.new_tag(u"p")
-        p[u'class'] = self._recreate_p_lang(caption, lang, captions)
-        p.string = u'&nbsp;'
-
-        sync.append(p)
-
-        return sami
+    def _recreate_blank_tag(self, caption, lang, primary, captions):
+        sync = self._recreate_sync(lang, primary, self.last_time)
+        sync.append(
+            {u'class': self._recreate_p_lang(caption, lang, captions)},
+            u'&nbsp;'
+        )
 
     def _recreate_p_lang(self, caption, lang, captions):
         try:
@@ -594,11 +847,17 @@ class SAMIWriter(BaseWriter):
 class SAMIParser(HTMLParser):
     def __init__(self, *args, **kw):
         HTMLParser.__init__(self, *args, **kw)
-        self.sami = u''
+        # The normalized document is collected in chunks, joined only once
+        # at the end of the parsing
+        self.output = []
         self.line = u''
         self.styles = {}
         self.queue = deque()
+        # How many times each tag is present in the queue
+        self.open_tags = defaultdict(int)
         self.langs = set()
+        # The languages, in the order they first appear in the document
+        self.lang_order = []
         self.last_element = u''
         self.name2codepoint = name2codepoint.copy()
         self.name2codepoint[u'apos'] = 0x0027
@@ -626,23 +885,21 @@ class SAMIParser(HTMLParser):
             # if no language detected, set it as the default
             lang = lang or DEFAULT_LANGUAGE_CODE
             attrs.append((u'lang', lang))
-            self.langs.add(lang)
+            if lang not in self.langs:
+                self.langs.add(lang)
+                self.lang_order.append(lang)
 
         # clean-up line breaks
         if tag == u'br':
-            self.sami += u"<br/>"
+            self._emit_break()
         # add tag to queue
         else:
             # if already in queue, first close tags off in LIFO order
-            while tag in self.queue:
-                closer = self.queue.pop()
-                self.sami = self.sami + u"</%s>" % closer
+            self._close_tags_up_to(tag)
             # open new tag in queue
             self.queue.append(tag)
-            # add tag with attributes
-            for attr, value in attrs:
-                tag += u' %s="%s"' % (attr.lower(), value)
-            self.sami += u"<%s>" % tag
+            self.open_tags[tag] += 1
+            self._emit_starttag(tag, attrs)
 
     # override the parser's handling of endtags
     def handle_endtag(self, tag):
@@ -655,84 +912,167 @@ class SAMIParser(HTMLParser):
             return
 
         # close off tags in LIFO order, if matching starting tag in queue
-        while tag in self.queue:
+        self._close_tags_up_to(tag)
+
+    def _close_tags_up_to(self, tag):
+        """If the tag is open, close it, together with all the tags opened
+        after it, in LIFO order.
+        """
+        while self.open_tags[tag]:
             closing_tag = self.queue.pop()
-            self.sami += u"</%s>" % closing_tag
+            self.open_tags[closing_tag] -= 1
+            self._emit_endtag(closing_tag)
 
     def handle_entityref(self, name):
         if name in [u'gt', u'lt']:
-            self.sami += u'&%s;' % name
+            self._emit_markup_entity(name)
         else:
             try:
-                self.sami += unichr(self.name2codepoint[name])
+                self._emit_data(unichr(self.name2codepoint[name]))
             except (KeyError, ValueError):
-                self.sami += u'&%s' % name
+                self._emit_data(u'&%s' % name)
 
         self.last_element = u''
 
     def handle_charref(self, name):
         if name[0] == u'x':
-            self.sami += unichr(int(name[1:], 16))
+            self._emit_data(unichr(int(name[1:], 16)))
         else:
-            self.sami += unichr(int(name))
+            self._emit_data(unichr(int(name)))
 
     # override the parser's handling of data
     def handle_data(self, data):
-        self.sami += data
+        self._emit_data(data)
         self.last_element = u''
 
+    # The methods below receive the normalized document, one piece at a time.
+    # Override them to consume it in some other way than as markup.
+    def _emit_starttag(self, tag, attrs):
+        self.output.append(u"<%s" % tag)
+        for attr, value in attrs:
+            self.output.append(u' %s="%s"' % (attr.lower(), value))
+        self.output.append(u">")
+
+    def _emit_endtag(self, tag):
+        self.output.append(u"</%s>" % tag)
+
+    def _emit_break(self):
+        self.output.append(u"<br/>")
+
+    def _emit_markup_entity(self, name):
+        """Entities that must stay escaped in the markup (e.g. &lt;)"""
+        self.output.append(u'&%s;' % name)
+
+    def _emit_data(self, data):
+        self.output.append(data)
+
+    def _get_result(self):
+        """What feed() returns besides the styles and languages"""
+        return u''.join(self.output)
+
     # override the parser's feed function
     def feed(self, data):
         """
         :param data: Raw SAMI unicode string
         :returns: tuple (unicode, dict, set)
         """
-        no_cc = u'no closed captioning available'
+        lower_data = data.lower()
+        self._check_content(lower_data)
+
+        # try to find style tag in SAMI, only looking for it in the head
+        self._parse_styles(data[:lower_data.find(u"</head>")])
 
-        if u'<html' in data.lower():
+        self._feed_markup(self._fix_markup(data))
+        self._close_all_tags()
+
+        return self._get_result(), self.styles, self.langs
+
+    def _check_content(self, lower_data):
+        """
+        :param lower_data: The lowercased SAMI content, or a part of it
+        :raises CaptionReadSyntaxError: if the content isn't captions
+        """
+        if u'<html' in lower_data:
             raise CaptionReadSyntaxError(
                 u'SAMI File seems to be an HTML file.')
-        elif no_cc in data.lower():
-            raise CaptionReadSyntaxError(u'SAMI File contains "%s"' % no_cc)
+        elif _NO_CC in lower_data:
+            raise CaptionReadSyntaxError(u'SAMI File contains "%s"' % _NO_CC)
 
-        # try to find style tag in SAMI
+    def _parse_styles(self, head):
+        """Set self.styles from the <style> tag of the head, if there's one
+        """
         try:
-            # prevent BS4 error with huge SAMI files with unclosed tags
-            index = data.lower().find(u"</head>")
-
             self.styles = self._css_parse(
-                BeautifulSoup(data[:index]).find(u'style').get_text())
+                _STYLE_TAG_PATTERN.search(head).group(1))
         except AttributeError:
             self.styles = {}
 
+    def _fix_markup(self, data):
         # fix erroneous italics tags
         data = data.replace(u'<i/>', u'<i>')
 
         # fix awkward tags found in some SAMIs
-        data = data.replace(u';>', u'>')
+        return data.replace(u';>', u'>')
+
+    def _feed_markup(self, data):
+        """Feed (a part of) the markup to the HTMLParser"""
         try:
             HTMLParser.feed(self, data)
         except HTMLParseError as e:
             raise CaptionReadSyntaxError(e)
 
+    def _close_all_tags(self):
         # close any tags that remain in the queue
-        while self.queue != deque([]):
+        while self.queue:
             closing_tag = self.queue.pop()
-            self.sami += u"</%s>" % closing_tag
-
-        return self.sami, self.styles, self.langs
+            self.open_tags[closing_tag] -= 1
+            self._emit_endtag(closing_tag)
 
     # parse the SAMI's stylesheet
     def _css_parse(self, css):
         """
-        Parse styling via cssutils modules
+        Parse styling with the built-in parser for the simple stylesheets
+        SAMI files use, falling back to cssutils for anything else. The
+        parsed rules are cached by the stylesheet's content.
         :rtype: dict
         """
-        sheet = parseString(css)
+        try:
+            rules = _css_rules_cache[css]
+        except KeyError:
+            try:
+                rules = _parse_simple_css(css)
+            except _UnsupportedCSS:
+                rules = self._cssutils_parse(css)
+            if len(_css_rules_cache) >= _CSS_RULES_CACHE_SIZE:
+                _css_rules_cache.clear()
+            _css_rules_cache[css] = rules
+
         style_sheet = {}
+        for selector, declarations in rules:
+            new_style = {}
+            for name, value in declarations:
+                new_style[name] = value
+            if new_style:
+                style_sheet[selector] = new_style
+
+        return style_sheet
+
+    def _cssutils_parse(self, css):
+        """
+        Parse styling via cssutils modules
+        :returns: list of (selector, declarations) tuples, where declarations
+            is a list of (name, value) tuples
+        """
+        # cssutils is slow to import, so it's only imported when needed
+        from cssutils import parseString, log, css as cssutils_css
+        # change cssutils default logging
+        log.setLevel(FATAL)
+
+        sheet = parseString(css)
+        rules = []
 
         for rule in sheet:
-            new_style = {}
+            declarations = []
             selector = rule.selectorText.lower()
             if selector[0] in [u'#', u'.']:
                 selector = selector[1:]
@@ -742,14 +1082,13 @@ class SAMIParser(HTMLParser):
                     cv = cssutils_css.ColorValue(prop.value)
                     # Code for RGB to hex conversion comes from
                     # http://bit.ly/1kwfBnQ
-                    new_style[u'color'] = u"#%02x%02x%02x" % (
-                        cv.red, cv.green, cv.blue)
+                    declarations.append((u'color', u"#%02x%02x%02x" % (
+                        cv.red, cv.green, cv.blue)))
                 else:
-                    new_style[prop.name] = prop.value
-            if new_style:
-                style_sheet[selector] = new_style
+                    declarations.append((prop.name, prop.value))
+            rules.append((selector, declarations))
 
-        return style_sheet
+        return rules
 
     def _find_lang(self, attrs):
         for attr, value in attrs:
@@ -764,3 +1103,490 @@ class SAMIParser(HTMLParser):
                     pass
 
         return None
+
+
+class SAMIParagraphParser(SAMIParser):
+    """Builds the <p> tags of a SAMI document straight from the parsing
+    events, instead of writing the normalized document as markup. The tags
+    are lightweight objects which the SAMIReader translates just like the
+    BeautifulSoup tags.
+
+    feed() returns a list of (start, p) tuples in document order instead of
+    the normalized document, where start is the start time (in milliseconds)
+    of the SYNC tag containing the p tag.
+    """
+    def __init__(self, *args, **kw):
+        SAMIParser.__init__(self, *args, **kw)
+        self.paragraphs = []
+        self.sync_start = None
+        # The innermost open element of the current <p> tag (None when
+        # outside of a <p> tag) and its pending text
+        self.element = None
+        self.text = []
+
+    def _emit_starttag(self, tag, attrs):
+        self._flush_text()
+        element = _SAMIElement(tag, attrs, self.element)
+
+        if tag == u'sync':
+            self.sync_start = element.attrs.get(u'start')
+
+        if self.element is not None:
+            self.element.contents.append(element)
+            self.element = element
+        elif tag == u'p' and self.sync_start is not None:
+            # <p> tags outside of a <sync> tag have no timing, skip them
+            self.paragraphs.append((int(float(self.sync_start)), element))
+            self.element = element
+            # SAMIParser adds the language it detected as the last attribute
+            element.language = attrs[-1][1]
+
+    def _emit_endtag(self, tag):
+        self._flush_text()
+        if self.element is not None:
+            # Tags are always closed in LIFO order
+            self.element = self.element.parent
+        elif tag == u'sync':
+            self.sync_start = None
+
+    def _emit_break(self):
+        self._flush_text()
+        if self.element is not None:
+            self.element.contents.append(
+                _SAMIElement(u'br', (), self.element))
+
+    def _emit_markup_entity(self, name):
+        self._emit_data(unichr(self.name2codepoint[name]))
+
+    def _emit_data(self, data):
+        if self.element is not None:
+            self.text.append(data)
+
+    def _flush_text(self):
+        if self.text:
+            text = u''.join(self.text)
+            if not text.strip(u' \t\n\r'):
+                # Like lxml, shorten the whitespace-only text nodes
+                text = text[0]
+            self.element.contents.append(NavigableString(text))
+            self.text = []
+
+    def _get_result(self):
+        return self.paragraphs
+
+
+class _SAMIElement(object):
+    """The few parts of a BeautifulSoup Tag used by the SAMIReader"""
+    def __init__(self, name, attrs=(), parent=None):
+        """
+        :param name: the tag name
+        :param attrs: list of attribute tuples of type (u'name', u'value')
+        :param parent: the parent _SAMIElement
+        """
+        self.name = name
+        self.parent = parent
+        self.contents = []
+        # The language the SAMIParser detected, for the <p> tags
+        self.language = None
+        self.attrs = {}
+        for attr, value in attrs:
+            # Like in the markup, the first of the duplicated attributes wins
+            self.attrs.setdefault(attr.lower(), u'%s' % value)
+        if u'class' in self.attrs:
+            self.attrs[u'class'] = self.attrs[u'class'].split()
+
+    def get_text(self):
+        return u''.join(self._strings())
+
+    def _strings(self):
+        for child in self.contents:
+            if isinstance(child, NavigableString):
+                yield child
+            else:
+                for string in child._strings():
+                    yield string
+
+
+class _CaptionTimer(object):
+    """Sets the end times of the captions of a language as its <p> tags come:
+    each caption ends when the next <p> tag (empty or not) starts.
+    """
+    def __init__(self):
+        # The last caption, whose end time may still change
+        self.caption = None
+        self.milliseconds = 0
+
+    def add(self, milliseconds, caption):
+        """
+        :param milliseconds: the start of the SYNC tag of the <p> tag
+        :param caption: the Caption of the <p> tag, or None if it's empty
+        :returns: list with the captions whose end time is final now
+        """
+        final = []
+        self.milliseconds = milliseconds
+
+        if self.caption is not None:
+            if self.caption.end == 0:
+                self.caption.end = milliseconds * 1000
+            if self.caption.end != 0 or caption is not None:
+                final.append(self.caption)
+                self.caption = None
+
+        if caption is not None:
+            self.caption = caption
+
+        return final
+
+    def close(self):
+        """
+        :returns: list with the last caption, if it's not returned yet
+        """
+        if self.caption is None:
+            return []
+        if self.caption.end == 0:
+            # Arbitrarily make this last 4 seconds. Not ideal...
+            self.caption.end = (self.milliseconds + 4000) * 1000
+        return [self.caption]
+
+
+def _translate_sami_chunk(args):
+    """Runs SAMIReader._translate_document in the processes of a pool"""
+    reader, content, languages = args
+    return reader._translate_document(content, languages)
+
+
+def _read_in_chunks(source):
+    """
+    :param source: a string or a file-like object
+    :returns: generator of the parts of the source, of (at most)
+        _READ_CHUNK_SIZE characters
+    """
+    size = _READ_CHUNK_SIZE
+    if isinstance(source, basestring):
+        for start in range(0, len(source), size):
+            yield source[start:start + size]
+    else:
+        chunk = source.read(size)
+        while chunk:
+            yield chunk
+            chunk = source.read(size)
+
+
+def _has_language(p, language):
+    """Whether the <p> tag matches the CSS selector p[lang|=language]
+
+    :type p: _SAMIElement
+    :type language: unicode
+    """
+    p_lang = p.attrs.get(u'lang', u'').lower()
+    language = language.lower()
+    return p_lang == language or p_lang.startswith(language + u'-')
+
+
+def _copy_layouts_and_styles(caption_set):
+    """Return a new CaptionSet sharing the captions of the given one, with
+    its own copies of the layouts and style rules, which the SAMIWriter
+    modifies.
+
+    :type caption_set: CaptionSet
+    :rtype: CaptionSet
+    """
+    new_caption_set = CaptionSet()
+    new_caption_set.layout_info = caption_set.layout_info
+    # The dicts are filled key by key (like deepcopy does) so that the rules
+    # keep being written in the same order
+    new_caption_set.set_styles(dict(
+        (selector, dict(rules.items()))
+        for selector, rules in caption_set.get_styles()
+    ))
+
+    for lang in caption_set.get_languages():
+        new_caption_set.set_captions(lang, caption_set.get_captions(lang))
+        new_caption_set.set_layout_info(
+            lang, caption_set.get_layout_info(lang))
+
+    return new_caption_set
+
+
+class _SAMISync(object):
+    """A <sync> tag of the SAMIWriter, with its <p> tags rendered already"""
+    def __init__(self, start):
+        self.start = start
+        self.paragraphs = []
+
+    def append(self, attrs, markup):
+        """
+        :param attrs: dict with the attributes of the p tag
+        :param markup: the unicode content of the p tag
+        """
+        markup = markup.strip()
+        self.paragraphs.append(u'   <p%s>\n%s   </p>\n' % (
+            _render_attributes(attrs),
+            u'    %s\n' % markup if markup else u''
+        ))
+
+    def render(self):
+        start = _render_attributes({u'start': u'%s' % self.start})
+        if not self.paragraphs:
+            return u'  <sync%s/>\n' % start
+        return u'  <sync%s>\n%s  </sync>\n' % (
+            start, u''.join(self.paragraphs))
+
+
+def _render_attributes(attrs):
+    """Renders the attributes of a tag the way BeautifulSoup does it
+
+    :type attrs: dict
+    """
+    rendered = u''
+    for name, value in sorted(attrs.items()):
+        if isinstance(value, (list, tuple)):
+            value = u' '.join(value)
+        if u'"' not in value:
+            rendered += u' %s="%s"' % (name, value)
+        elif u"'" not in value:
+            rendered += u" %s='%s'" % (name, value)
+        else:
+            rendered += u' %s="%s"' % (name, value.replace(u'"', u'&quot;'))
+    return rendered
+
+
+class _SyncIndex(object):
+    """The <sync> tags of a SAMI document, kept both in document order and
+    sorted by their start time, so that the tags of the secondary languages
+    are placed by bisection instead of scanning the document.
+    """
+    def __init__(self):
+        self._starts = []
+        self._syncs = []  # same order as _starts
+        # Document order, as a doubly linked list keyed by id(sync)
+        self._first = None
+        self._last = None
+        self._next = {}
+        self._previous = {}
+        self._start_of = {}
+        # Whether the document order is sorted by start time. Overlapping
+        # captions in the primary language break it.
+        self._ordered = True
+
+    def is_empty(self):
+        return not self._syncs
+
+    def __iter__(self):
+        sync = self._first
+        while sync is not None:
+            yield sync
+            sync = self._next[id(sync)]
+
+    def append(self, start, sync):
+        """Adds the sync at the end of the document"""
+        if self._starts and start < self._starts[-1]:
+            self._ordered = False
+        self._link(sync, self._last, None)
+        self._index(bisect_right(self._starts, start), start, sync)
+
+    def find(self, start):
+        """Returns the first sync with the given start, or None"""
+        index = bisect_left(self._starts, start)
+        if index < len(self._starts) and self._starts[index] == start:
+            return self._syncs[index]
+
+    def insert(self, start, sync):
+        """Adds the sync right after the last sync (in document order)
+        starting before it or, if there is none, at the beginning of the
+        document.
+        """
+        index = bisect_left(self._starts, start)
+        earlier = self._syncs[index - 1] if index else None
+        if earlier is not None and not self._ordered:
+            earlier = self._last
+            while self._start_of[id(earlier)] >= start:
+                earlier = self._previous[id(earlier)]
+
+        if earlier is None:
+            self._link(sync, None, self._first)
+        else:
+            self._link(sync, earlier, self._next[id(earlier)])
+        self._index(index, start, sync)
+
+    def _index(self, index, start, sync):
+        self._starts.insert(index, start)
+        self._syncs.insert(index, sync)
+        self._start_of[id(sync)] = start
+
+    def _link(self, sync, previous, next_):
+        self._previous[id(sync)] = previous
+        self._next[id(sync)] = next_
+        if previous is None:
+            self._first = sync
+        else:
+            self._next[id(previous)] = sync
+        if next_ is None:
+            self._last = sync
+        else:
+            self._previous[id(next_)] = sync
+
+
+_NO_CC = u'no closed captioning available'
+_READ_CHUNK_SIZE = 64 * 1024
+_SYNC_START_PATTERN = re.compile(u'<sync[\s>]', re.IGNORECASE)
+_STYLE_TAG_PATTERN = re.compile(
+    u'<style(?:\s[^>]*)?>(.*?)(?:</style\s*>|\Z)', re.IGNORECASE | re.DOTALL)
+_CSS_RULE_PATTERN = re.compile(u'\s*([^{}]*?)\s*{([^{}]*)}')
+_CSS_SELECTOR_PATTERN = re.compile(u'^[#.]?-?[a-z_][a-z0-9_-]*$', re.IGNORECASE)
+_CSS_DECLARATION_PATTERN = re.compile(
+    u'^\s*(-?[a-z_][a-z0-9_-]*)\s*:\s*(.+?)\s*$', re.IGNORECASE | re.DOTALL)
+_CSS_VALUE_TOKEN_PATTERN = re.compile(
+    u'\s*(?:"([^"\\\\\n]*)"|\'([^\'"\\\\\n]*)\'|(,)|([^\s,\'"]+))')
+_CSS_IDENT_PATTERN = re.compile(u'^-?[a-z_][a-z0-9_-]*$', re.IGNORECASE)
+_CSS_NUMBER_PATTERN = re.compile(
+    u'^([+-]?)([0-9]+(?:\.[0-9]+)?|\.[0-9]+)(%|[a-z]*)$', re.IGNORECASE)
+_CSS_HEX_COLOR_PATTERN = re.compile(
+    u'^#(?:[0-9a-f]{3}|[0-9a-f]{6})$', re.IGNORECASE)
+_CSS_COLOR_NAMES = {
+    u'black': u'#000000', u'silver': u'#c0c0c0', u'gray': u'#808080',
+    u'white': u'#ffffff', u'maroon': u'#800000', u'red': u'#ff0000',
+    u'purple': u'#800080', u'fuchsia': u'#ff00ff', u'green': u'#008000',
+    u'lime': u'#00ff00', u'olive': u'#808000', u'yellow': u'#ffff00',
+    u'navy': u'#000080', u'blue': u'#0000ff', u'teal': u'#008080',
+    u'aqua': u'#00ffff'
+}
+
+_CSS_RULES_CACHE_SIZE = 64
+_css_rules_cache = {}
+
+
+class _UnsupportedCSS(Exception):
+    """The stylesheet needs the full cssutils parser"""
+
+
+def _parse_simple_css(css):
+    """Parses the CSS subset SAMI stylesheets use: rules with a single
+    element, class or id selector and simple declarations. The values are
+    normalized the same way cssutils does it.
+
+    :type css: unicode
+    :raises _UnsupportedCSS: on anything outside of this subset
+    :returns: list of (selector, declarations) tuples, where declarations is
+        a list of (name, value) tuples
+    """
+    css = css.replace(u'<!--', u' ').replace(u'-->', u' ')
+    if u'@' in css or u'\\' in css or u'/*' in css:
+        raise _UnsupportedCSS()
+
+    rules = []
+    position = 0
+    for match in _CSS_RULE_PATTERN.finditer(css):
+        if css[position:match.start()].strip():
+            raise _UnsupportedCSS()
+        position = match.end()
+
+        selector, declarations = match.groups()
+        if not _CSS_SELECTOR_PATTERN.match(selector):
+            raise _UnsupportedCSS()
+        selector = selector.lower()
+        if selector[0] in [u'#', u'.']:
+            selector = selector[1:]
+
+        new_declarations = []
+        for declaration in declarations.split(u';'):
+            if not declaration.strip():
+                continue
+            declaration = _CSS_DECLARATION_PATTERN.match(declaration)
+            if not declaration:
+                raise _UnsupportedCSS()
+            name, value = declaration.groups()
+            name = name.lower()
+            if name == u'color':
+                value = _normalize_css_color(value)
+            else:
+                value = _normalize_css_value(value)
+            # Like cssutils, only keep the last of the duplicated properties
+            new_declarations = [
+                declaration for declaration in new_declarations
+                if declaration[0] != name
+            ]
+            new_declarations.append((name, value))
+        rules.append((selector, new_declarations))
+
+    if css[position:].strip():
+        raise _UnsupportedCSS()
+
+    return rules
+
+
+def _normalize_css_color(value):
+    """Converts a color to its #rrggbb form"""
+    if _CSS_HEX_COLOR_PATTERN.match(value):
+        value = value[1:].lower()
+        if len(value) == 3:
+            value = u''.join(digit * 2 for digit in value)
+        return u'#' + value
+    try:
+        return _CSS_COLOR_NAMES[value.lower()]
+    except KeyError:
+        raise _UnsupportedCSS()
+
+
+def _normalize_css_value(value):
+    """Normalizes a value made of identifiers, numbers, hex colors and
+    strings, separated by whitespace or commas
+    """
+    parts = []
+    position = 0
+    previous = None
+    while position < len(value):
+        match = _CSS_VALUE_TOKEN_PATTERN.match(value, position)
+        if not match:
+            raise _UnsupportedCSS()
+        position = match.end()
+        double_quoted, single_quoted, comma, token = match.groups()
+
+        if comma:
+            if previous in [None, u',']:
+                raise _UnsupportedCSS()
+            parts.append(comma)
+            previous = comma
+            continue
+        if double_quoted is not None:
+            token = u'"%s"' % double_quoted
+        elif single_quoted is not None:
+            token = u'"%s"' % single_quoted
+        else:
+            token = _normalize_css_token(token)
+        if previous is not None:
+            parts.append(u' ')
+        parts.append(token)
+        previous = token
+
+    if previous == u',':
+        raise _UnsupportedCSS()
+    return u''.join(parts)
+
+
+def _normalize_css_token(token):
+    if _CSS_IDENT_PATTERN.match(token):
+        return token
+
+    if _CSS_HEX_COLOR_PATTERN.match(token):
+        # cssutils shortens the colors it can (keeping their case)
+        if len(token) == 7 and token[1] == token[2] and \
+                token[3] == token[4] and token[5] == token[6]:
+            return u'#' + token[1] + token[3] + token[5]
+        return token
+
+    number = _CSS_NUMBER_PATTERN.match(token)
+    if not number:
+        raise _UnsupportedCSS()
+    sign, digits, unit = number.groups()
+    unit = unit.lower()
+    number = float(digits)
+    if number == 0:
+        return u'0%' if unit == u'%' else u'0'
+    if number == int(number):
+        digits = u'%d' % number
+    else:
+        digits = (u'%f' % number).rstrip(u'0')
+        if digits.endswith(u'.'):
+            digits += u'0'
+    return sign + digits + unit
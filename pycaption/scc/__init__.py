@@ -84,7 +84,7 @@ import string
 import textwrap
 
 from pycaption.base import (
-    BaseReader, BaseWriter, CaptionSet, CaptionNode,
+    BaseReader, BaseSingleLanguageWriter, CaptionSet, CaptionNode,
 )
 from pycaption.exceptions import CaptionReadNoCaptions, InvalidInputError
 from .constants import (
@@ -98,7 +98,6 @@ from .specialized_collections import (
     InstructionNodeCreator)
 
 from .state_machines import DefaultProvidingPositionTracker
-from copy import deepcopy
 
 
 class NodeCreatorFactory(object):
@@ -481,21 +480,26 @@ class SCCReader(BaseReader):
         self.caption_stash.correct_last_timing(self.time, force=True)
 
 
-class SCCWriter(BaseWriter):
+class SCCWriter(BaseSingleLanguageWriter):
 
     def __init__(self, *args, **kw):
         super(SCCWriter, self).__init__(*args, **kw)
 
     def write(self, caption_set):
-        output = HEADER + u'\n\n'
-
         if caption_set.is_empty():
-            return output
-
-        caption_set = deepcopy(caption_set)
+            return HEADER + u'\n\n'
 
         # Only support one language.
-        lang = caption_set.get_languages()[0]
+        lang = self._get_language(caption_set)
+
+        return self._write_language(caption_set, lang)
+
+    def _write_language(self, caption_set, lang):
+        """
+        :type caption_set: CaptionSet
+        :rtype: unicode
+        """
+        output = HEADER + u'\n\n'
         captions = caption_set.get_captions(lang)
 
         # PASS 1: compute codes for each caption
@@ -1,11 +1,24 @@
-from copy import deepcopy
+import re
+from io import StringIO
+from multiprocessing import Pool
 
 from .base import (
     BaseReader, BaseWriter, CaptionSet, Caption, CaptionNode)
-from .exceptions import CaptionReadNoCaptions, InvalidInputError
+from .exceptions import (
+    CaptionReadNoCaptions, CaptionReadSyntaxError, InvalidInputError)
+from .tail import TailState, read_appended_cues
+from .utils import get_raw_content
 
 
 class SRTReader(BaseReader):
+    def __init__(self, *args, **kw):
+        """
+        :param processes: If more than 1, the content is split at blank lines
+            in this many chunks of cues, which are parsed in parallel by a
+            pool of processes
+        """
+        self.processes = kw.get('processes', 1)
+
     def detect(self, content):
         lines = content.splitlines()
         if lines[0].isdigit() and u'-->' in lines[1]:
@@ -13,39 +26,22 @@ class SRTReader(BaseReader):
         else:
             return False
 
-    def read(self, content, lang=u'en-US'):
-        if type(content) != unicode:
-            raise InvalidInputError('The content is not a unicode string.')
+    def read(self, content, lang=u'en-US', encoding=None):
+        """
+        :param content: unicode string, or raw content (see
+            pycaption.utils.get_raw_content) of which only the text of the
+            cues is decoded
+        :param encoding: the encoding of raw content
+        """
+        content, encoding = get_raw_content(content, encoding)
 
         caption_set = CaptionSet()
-        lines = content.splitlines()
-        start_line = 0
-        captions = []
-
-        while start_line < len(lines):
-            if not lines[start_line].isdigit():
-                break
-
-            caption = Caption()
-
-            end_line = self._find_text_line(start_line, lines)
-
-            timing = lines[start_line + 1].split(u'-->')
-            caption.start = self._srttomicro(timing[0].strip(u' \r\n'))
-            caption.end = self._srttomicro(timing[1].strip(u' \r\n'))
-
-            for line in lines[start_line + 2:end_line - 1]:
-                # skip extra blank lines
-                if not caption.nodes or line != u'':
-                    caption.nodes.append(CaptionNode.create_text(line))
-                    caption.nodes.append(CaptionNode.create_break())
 
-            # remove last line break from end of caption list
-            if len(caption.nodes):
-                caption.nodes.pop()
-                captions.append(caption)
-
-            start_line = end_line
+        chunks = self._split_in_chunks(content)
+        if len(chunks) > 1:
+            captions = self._read_chunks(chunks, encoding)
+        else:
+            captions = self._read_cues(content, encoding)
 
         caption_set.set_captions(lang, captions)
 
@@ -54,74 +50,367 @@ class SRTReader(BaseReader):
 
         return caption_set
 
-    def _srttomicro(self, stamp):
-        timesplit = stamp.split(u':')
-        if u',' not in timesplit[2]:
-            timesplit[2] = timesplit[2] + u',000'
-        secsplit = timesplit[2].split(u',')
-        microseconds = (int(timesplit[0]) * 3600000000 +
-                        int(timesplit[1]) * 60000000 +
-                        int(secsplit[0]) * 1000000 +
-                        int(secsplit[1]) * 1000)
-
-        return microseconds
-
-    def _find_text_line(self, start_line, lines):
-        end_line = start_line + 1
-
-        while end_line < len(lines):
-            if lines[end_line].strip() == u"":
-                return end_line + 1
-            end_line += 1
-
-        return end_line + 1
+    def read_range(self, fp, cue_index, start, end, lang=u'en-US',
+                   encoding='utf-8'):
+        """
+        Read only the cues overlapping a time range, finding them with an
+        index of the cues of the file.
+
+        :param fp: the SRT file, opened in binary mode
+        :type cue_index: CueIndex
+        :param start: the start of the time range, in microseconds
+        :param end: the end of the time range, in microseconds
+        :returns: CaptionSet, empty if no cue overlaps the range
+        """
+        caption_set = CaptionSet()
+        content = u'\n\n'.join(
+            cue_index.read_cues(fp, start, end, encoding))
+        caption_set.set_captions(lang, self._read_cues(content))
+        return caption_set
 
+    def read_tail(self, fp, state=None, encoding='utf-8', final=False):
+        """
+        Read the cues appended to a growing file since the previous call, to
+        poll it during a live event. A trailing cue is held back until the
+        blank line ending it is written. The errors report the line of the
+        malformed cue in the whole file.
+
+        :param fp: the SRT file, opened in binary mode
+        :type state: TailState
+        :param state: the state returned by the previous call, if any
+        :param final: If True, the file isn't growing anymore, and its last
+            cue is read even without a blank line after it
+        :returns: tuple (list of the new Captions, TailState to resume from)
+        """
+        state = state or TailState()
+        text, offset = read_appended_cues(
+            fp, state, encoding, final, blank_lines_end_cues=True)
+
+        captions = self._read_cues(text, first_line=state.line + 1)
+        if captions:
+            last_start_time = captions[-1].start
+        else:
+            last_start_time = state.last_start_time
+
+        return captions, TailState(
+            offset, state.line + _count_line_breaks(text), last_start_time)
+
+    def _read_cues(self, content, encoding=None, first_line=1):
+        """
+        Read the cues one after the other, from the end of the previous one.
+
+        :param content: unicode string, or raw content in the given encoding
+        :param first_line: the number of the first line of the content in the
+            file, for the error messages
+        :returns: list of the Captions of the cues with text
+        :raises CaptionReadSyntaxError: at the first malformed cue, with its
+            line number
+        """
+        captions = []
+        if encoding is None:
+            pattern = _SRT_CUE_PATTERN
+            blank_lines_pattern = _BLANK_LINES_PATTERN
+        else:
+            pattern = _SRT_RAW_CUE_PATTERN
+            blank_lines_pattern = _RAW_BLANK_LINES_PATTERN
+
+        position = blank_lines_pattern.match(content).end()
+        while position < len(content):
+            match = pattern.match(content, position)
+            if match is None:
+                raise _malformed_cue_error(
+                    content, position, encoding, first_line)
+
+            text = match.group(9)
+            if encoding is not None:
+                text = text.decode(encoding)
+            # The text starts with the line break ending the timing line
+            caption = self._create_caption(match, text.splitlines()[1:])
+            if caption is not None:
+                captions.append(caption)
 
-class SRTWriter(BaseWriter):
-    def write(self, caption_set):
-        caption_set = deepcopy(caption_set)
+            position = blank_lines_pattern.match(content, match.end()).end()
 
-        srt_captions = []
+        return captions
 
-        for lang in caption_set.get_languages():
-            srt_captions.append(
-                self._recreate_lang(caption_set.get_captions(lang))
-            )
+    def _split_in_chunks(self, content):
+        """
+        Split the content in (at most) self.processes chunks of similar size,
+        right after blank lines, which no cue goes across.
 
-        caption_content = u'MULTI-LANGUAGE SRT\n'.join(srt_captions)
-        return caption_content
+        :param content: unicode string or raw content
+        :rtype: list
+        """
+        if not self.processes or self.processes < 2:
+            return [content]
 
-    def _recreate_lang(self, captions):
-        srt = u''
-        count = 1
+        chunk_size = -(-len(content) // self.processes)
+        boundaries = [0]
+        for position in range(chunk_size, len(content), chunk_size):
+            if position < boundaries[-1]:
+                continue
+            match = _BLANK_LINE_PATTERN.search(content, position)
+            if match is None or match.end() == len(content):
+                break
+            boundaries.append(match.end())
+        boundaries.append(len(content))
+
+        return [content[start:end]
+                for start, end in zip(boundaries, boundaries[1:])]
+
+    def _read_chunks(self, chunks, encoding=None):
+        """
+        Read the chunks of the content in a pool of processes.
+
+        :type chunks: list
+        :param encoding: the encoding of raw content
+        :returns: list of the Captions of all the chunks, in order
+        :raises CaptionReadSyntaxError: at the first malformed cue, as a
+            serial read
+        """
+        pool = Pool(min(self.processes, len(chunks)))
+        try:
+            results = pool.map(
+                _read_srt_chunk,
+                [(self, chunk, encoding) for chunk in chunks])
+        finally:
+            pool.close()
+            pool.join()
 
-        for caption in captions:
-            srt += u'%s\n' % count
+        captions = []
+        for index, chunk_captions in enumerate(results):
+            if chunk_captions is None:
+                # The chunk is read again here, to raise the error with the
+                # number of its line in the whole content
+                first_line = 1 + sum(
+                    _count_line_breaks(chunk) for chunk in chunks[:index])
+                self._read_cues(chunks[index], encoding, first_line)
+            captions.extend(chunk_captions)
+        return captions
+
+    def iter_captions(self, source):
+        """
+        Read the captions one at a time, as the lines of the source come, so
+        that huge or still growing files can be processed with constant
+        memory.
+
+        :param source: unicode string, or iterable of unicode lines (e.g. a
+            file opened with io.open)
+        :returns: generator of Captions, each one yielded once the blank line
+            ending it is read
+        :raises CaptionReadSyntaxError: at the first malformed cue, with its
+            line number
+        """
+        if isinstance(source, basestring):
+            source = source.splitlines()
+
+        # The line of the index read, while waiting for the timing line
+        index_line = None
+        # The timing of the cue whose text is being read
+        timing = None
+        lines = []
+        found_captions = False
+
+        for line_number, line in enumerate(source, 1):
+            if type(line) != unicode:
+                raise InvalidInputError(
+                    'The content is not a unicode string.')
+            line = line.rstrip(u'\r\n')
+
+            if _SRT_BLANK_LINE_PATTERN.match(line):
+                if index_line is not None:
+                    raise CaptionReadSyntaxError(
+                        u'Cue without timing. (line %d)' % index_line)
+                if timing is not None:
+                    caption = self._create_caption(timing, lines)
+                    timing = None
+                    if caption is not None:
+                        found_captions = True
+                        yield caption
+            elif timing is not None:
+                lines.append(line)
+            else:
+                timing = _SRT_TIMING_LINE_PATTERN.match(line)
+                if timing is not None:
+                    index_line = None
+                    lines = []
+                elif (index_line is None and
+                        _SRT_INDEX_LINE_PATTERN.match(line)):
+                    index_line = line_number
+                else:
+                    raise CaptionReadSyntaxError(
+                        u'Invalid timing line. (line %d)' % line_number)
+
+        if index_line is not None:
+            raise CaptionReadSyntaxError(
+                u'Cue without timing. (line %d)' % index_line)
+        if timing is not None:
+            caption = self._create_caption(timing, lines)
+            if caption is not None:
+                found_captions = True
+                yield caption
+
+        if not found_captions:
+            raise CaptionReadNoCaptions(u"empty caption file")
 
-            start = caption.format_start(msec_separator=u',')
-            end = caption.format_end(msec_separator=u',')
-            timestamp = u'%s --> %s\n' % (start[:12], end[:12])
+    def _create_caption(self, timing, lines):
+        """
+        :param timing: a match of the timing line of the cue
+        :param lines: the text lines of the cue
+        :returns: Caption, or None if the cue has no text
+        """
+        caption = Caption()
+        caption.start = _groups_to_microseconds(*timing.group(1, 2, 3, 4))
+        caption.end = _groups_to_microseconds(*timing.group(5, 6, 7, 8))
 
-            srt += timestamp.replace(u'.', u',')
+        for line in lines:
+            caption.nodes.append(CaptionNode.create_text(line))
+            caption.nodes.append(CaptionNode.create_break())
 
-            new_content = u''
-            for node in caption.nodes:
-                new_content = self._recreate_line(new_content, node)
+        # remove last line break from end of caption list
+        if not caption.nodes:
+            return None
+        caption.nodes.pop()
 
-            # Eliminate excessive line breaks
-            new_content = new_content.strip()
-            while u'\n\n' in new_content:
-                new_content = new_content.replace(u'\n\n', u'\n')
+        return caption
 
-            srt += u"%s%s" % (new_content, u'\n\n')
-            count += 1
 
-        return srt[:-1]  # remove unwanted newline at end of file
+class SRTWriter(BaseWriter):
+    def write(self, caption_set):
+        output = StringIO()
+        self.write_to(caption_set, output)
+        return output.getvalue()
+
+    def write_to(self, caption_set, fp):
+        """
+        Writes the SRT captions straight to a file-like object. The languages
+        are joined by a 'MULTI-LANGUAGE SRT' line.
+
+        :type caption_set: CaptionSet
+        :param fp: file-like object the unicode content is written to
+        """
+        for index, lang in enumerate(caption_set.get_languages()):
+            if index:
+                fp.write(u'MULTI-LANGUAGE SRT\n')
+            self.write_captions(caption_set.get_captions(lang), fp)
+
+    def write_captions(self, captions, fp):
+        """
+        Writes the cues of a single language as the captions come, e.g. from
+        SRTReader.iter_captions().
+
+        :param captions: iterable of Captions
+        :param fp: file-like object the unicode cues are written to
+        """
+        for count, caption in enumerate(captions, 1):
+            # The cues are separated by a blank line
+            if count > 1:
+                fp.write(u'\n')
 
-    def _recreate_line(self, srt, line):
-        if line.type_ == CaptionNode.TEXT:
-            return srt + u'%s ' % line.content
-        elif line.type_ == CaptionNode.BREAK:
-            return srt + u'\n'
-        else:
-            return srt
+            start = caption.format_start(msec_separator=u',')
+            end = caption.format_end(msec_separator=u',')
+            timestamp = u'%s --> %s' % (start[:12], end[:12])
+
+            fp.write(u'%s\n%s\n%s\n' % (
+                count, timestamp.replace(u'.', u','),
+                self._recreate_text(caption)))
+
+    def _recreate_text(self, caption):
+        parts = []
+        for node in caption.nodes:
+            if node.type_ == CaptionNode.TEXT:
+                parts.append(u'%s ' % node.content)
+            elif node.type_ == CaptionNode.BREAK:
+                parts.append(u'\n')
+
+        # Eliminate excessive line breaks
+        return _LINE_BREAKS_PATTERN.sub(u'\n', u''.join(parts).strip())
+
+
+def _read_srt_chunk(args):
+    """
+    Runs SRTReader._read_cues in the processes of a pool.
+
+    :returns: list of Captions, or None if the chunk has a malformed cue
+    """
+    reader, content, encoding = args
+    try:
+        return reader._read_cues(content, encoding)
+    except CaptionReadSyntaxError:
+        return None
+
+
+def _count_line_breaks(content, end=None):
+    """
+    :param content: unicode string or raw content
+    :param end: where to stop counting, the end of the content by default
+    """
+    if end is None:
+        end = len(content)
+    return len(_LINE_BREAK_PATTERN.findall(content, 0, end))
+
+
+def _malformed_cue_error(content, position, encoding, first_line):
+    """
+    :param position: the start of the lines which aren't a cue
+    :param first_line: the number of the first line of the content
+    :returns: CaptionReadSyntaxError reporting the malformed cue as
+        SRTReader.iter_captions does
+    """
+    line_number = first_line + _count_line_breaks(content, position)
+    match = _TWO_LINES_PATTERN.match(content, position)
+    lines = match.group(1, 2)
+    if encoding is not None:
+        lines = [line.decode(encoding, 'replace') for line in lines]
+
+    if not _SRT_INDEX_LINE_PATTERN.match(lines[0]):
+        return CaptionReadSyntaxError(
+            u'Invalid timing line. (line %d)' % line_number)
+    if _SRT_BLANK_LINE_PATTERN.match(lines[1]):
+        return CaptionReadSyntaxError(
+            u'Cue without timing. (line %d)' % line_number)
+    return CaptionReadSyntaxError(
+        u'Invalid timing line. (line %d)' % (line_number + 1))
+
+
+def _groups_to_microseconds(hours, minutes, seconds, milliseconds):
+    """
+    :returns: the microseconds of an SRT timestamp, whose milliseconds
+        are optional
+    """
+    microseconds = (int(hours) * 3600000000 + int(minutes) * 60000000 +
+                    int(seconds) * 1000000)
+    if milliseconds:
+        microseconds += int(milliseconds) * 1000
+    return microseconds
+
+
+_LINE_BREAKS_PATTERN = re.compile(u'\n\n+')
+_SRT_TIMESTAMP = u'(\d+):(\d+):(\d+)(?:[,.](\d+))?'
+_SRT_TIMING = (u'[ \t]*' + _SRT_TIMESTAMP + u'[ \t]*-->[ \t]*' +
+               _SRT_TIMESTAMP + u'[^\r\n]*')
+# A cue starts at the beginning of a line (or after the byte order mark),
+# with an optional index line followed by the timing line, and its text goes
+# on until a blank line
+_SRT_CUE = (
+    u'(?:[ \t]*\d+[ \t]*(?:\r\n|\r|\n))?' + _SRT_TIMING +
+    u'((?:(?:\r\n|\r|\n)[^\S\r\n]*\S[^\r\n]*)*)'
+)
+_SRT_CUE_PATTERN = re.compile(u'(?:\A\ufeff?|(?<=[\r\n]))' + _SRT_CUE)
+# The same, for raw content in an encoding compatible with ASCII
+_SRT_RAW_CUE_PATTERN = re.compile(
+    b'(?:\A(?:\xef\xbb\xbf)?|(?<=[\r\n]))' + _SRT_CUE.encode('ascii'))
+_SRT_TIMING_LINE_PATTERN = re.compile(_SRT_TIMING + u'$')
+_SRT_INDEX_LINE_PATTERN = re.compile(u'[ \t]*\d+[ \t]*$')
+_SRT_BLANK_LINE_PATTERN = re.compile(u'\s*$')
+# The line break ending a line (if any), and the blank lines after it, up
+# to the end of the content
+_BLANK_LINES = u'(?:[^\S\r\n]*(?:\r\n|\r|\n))*(?:[^\S\r\n]*\Z)?'
+_BLANK_LINES_PATTERN = re.compile(_BLANK_LINES)
+_RAW_BLANK_LINES_PATTERN = re.compile(_BLANK_LINES.encode('ascii'))
+# The line break ending a line, followed by a blank line
+_BLANK_LINE_PATTERN = re.compile(
+    u'(?:\r\n|\r(?!\n)|\n)[^\S\r\n]*(?:\r\n|\r(?!\n)|\n)')
+_LINE_BREAK_PATTERN = re.compile(u'\r\n|\r|\n')
+# The first two lines from a position
+_TWO_LINES_PATTERN = re.compile(u'([^\r\n]*)(?:\r\n|\r|\n)?([^\r\n]*)')
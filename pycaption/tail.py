@@ -0,0 +1,81 @@
+import re
+
+
+class TailState(object):
+    """
+    Where the read of a growing SRT or WebVTT file stopped: the byte offset
+    right after the last complete cue read, and the state of the parser
+    there, to resume the read from. Use as a value object.
+    """
+    def __init__(self, offset=0, line=0, last_start_time=0):
+        """
+        :param offset: the byte offset after the last complete cue read
+        :param line: the index of the line at that offset, for the error
+            messages
+        :param last_start_time: the start of the last cue read, in
+            microseconds, to check the order of the next ones
+        """
+        self.offset = offset
+        self.line = line
+        self.last_start_time = last_start_time
+
+    def __repr__(self):
+        return u'<TailState (offset: {}, line: {}, last start: {})>'.format(
+            self.offset, self.line, self.last_start_time)
+
+    def __eq__(self, other):
+        return (
+            type(self) == type(other) and
+            self.serialized() == other.serialized()
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def serialized(self):
+        """Returns a tuple of the values of this object, from which it can be
+        created again: TailState(*state.serialized())
+        """
+        return self.offset, self.line, self.last_start_time
+
+
+def read_appended_cues(fp, state, encoding, final=False,
+                       blank_lines_end_cues=False):
+    """
+    Read the cues appended to a file since the given state, up to the end of
+    the last one which is complete, i.e. followed by an empty line. The
+    lines must end with '\\n' or '\\r\\n'.
+
+    :param fp: the caption file, opened in binary mode
+    :type state: TailState
+    :param encoding: the encoding of the file, which must be ASCII-compatible
+    :param final: If True, the file isn't growing anymore, and the last cue
+        is read even if it isn't followed by an empty line
+    :param blank_lines_end_cues: If True, lines of whitespace end the cues as
+        well, as in SRT
+    :returns: tuple (unicode text of the complete cues, byte offset after
+        them)
+    """
+    fp.seek(state.offset)
+    data = fp.read()
+
+    if final:
+        end = len(data)
+    else:
+        if blank_lines_end_cues:
+            pattern = _BLANK_LINE_PATTERN
+        else:
+            pattern = _EMPTY_LINE_PATTERN
+        end = 0
+        for match in pattern.finditer(data):
+            end = match.end()
+
+    text = data[:end].decode(encoding)
+    if state.offset == 0 and text.startswith(u'\ufeff'):
+        text = text[1:]
+
+    return text, state.offset + end
+
+
+_EMPTY_LINE_PATTERN = re.compile(b'\r?\n\r?\n')
+_BLANK_LINE_PATTERN = re.compile(b'\r?\n[ \t\f\v]*\r?\n')
@@ -1,3 +1,9 @@
+import codecs
+import mmap
+
+from .exceptions import InvalidInputError
+
+
 def is_leaf(element):
     """
     Return True if the element is a leaf, False otherwise. The element is
@@ -8,3 +14,56 @@ def is_leaf(element):
     if not name or name == 'br':
         return True
     return False
+
+
+def get_raw_content(content, encoding=None):
+    """
+    Check the content given to a reader that can scan raw bytes, decoding
+    only the parts of them it needs.
+
+    :param content: unicode string, or raw content: bytearray, mmap, or str
+        (only with a declared encoding, as in Python 2 it's usually a native
+        string passed by mistake). Not a memoryview, which the re module of
+        Python 2 can't scan without copying it whole: pass the object it
+        views instead.
+    :param encoding: the encoding of the raw content. A byte order mark
+        takes precedence over it, and UTF-8 is assumed without either.
+    :returns: tuple (content, encoding): either the raw content, in an
+        encoding compatible with ASCII, or a unicode string and None. Raw
+        content in other encodings (e.g. UTF-16) is decoded at once.
+    :raises InvalidInputError: for any other kind of content
+    """
+    if type(content) == unicode:
+        return content, None
+    if (not isinstance(content, (str, bytearray, mmap.mmap)) or
+            (isinstance(content, str) and encoding is None)):
+        raise InvalidInputError(
+            'The content is neither a unicode string nor raw bytes with a '
+            'declared encoding.')
+
+    bom_length = 0
+    for bom, bom_encoding in _BYTE_ORDER_MARKS:
+        if content[:len(bom)] == bom:
+            encoding = bom_encoding
+            bom_length = len(bom)
+            break
+    if encoding is None:
+        encoding = 'utf-8'
+
+    # The timing lines and line breaks are found on the raw content, so its
+    # ASCII characters have to be plain bytes
+    if u'\n-->0'.encode(encoding) != b'\n-->0':
+        return content[bom_length:].decode(encoding), None
+
+    return content, encoding
+
+
+# The UTF-32 marks go first, as the UTF-16 LE one is a prefix of the
+# UTF-32 LE one
+_BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
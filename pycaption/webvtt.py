@@ -1,17 +1,19 @@
 import sys
 import re
-from copy import deepcopy
+from multiprocessing import Pool
 
 from .base import (
-    BaseReader, BaseWriter, CaptionSet, Caption, CaptionNode
+    BaseReader, BaseSingleLanguageWriter, CaptionSet, Caption, CaptionNode
 )
 
-from .geometry import Layout
+from .geometry import Layout, Size, UnitEnum
 
 from .exceptions import (
     CaptionReadError, CaptionReadSyntaxError, CaptionReadNoCaptions,
     InvalidInputError
 )
+from .tail import TailState, read_appended_cues
+from .utils import get_raw_content
 
 # A WebVTT timing line has both start/end times and layout related settings
 # (referred to as 'cue settings' in the documentation)
@@ -35,6 +37,35 @@ WEBVTT_VERSION_OF = {
 
 DEFAULT_ALIGNMENT = u'middle'
 
+_RAW_LINE_PATTERN = re.compile(b'([^\r\n]*)(?:\r\n|\r|\n)?')
+# Stands for a line outside of the cues, left undecoded in raw content
+_UNDECODED_LINE = u'\ufffd'
+
+# The tokens of the cue text: the voice spans (with the name in group 1),
+# the tags stripped off (closing or not, with the name and the rest of the
+# tag in groups 3 and 4) and the entities (with the name in group 5)
+_CUE_TEXT_TOKEN_PATTERN = re.compile(
+    u'<v(?:\.\w+)* ([^>]*)>'
+    u'|<(/?)([cibuv]|ruby|rt|lang|\d+:\d{2}(?::\d{2})?\.\d{3})(.*?)>'
+    u'|&(lt|gt|lrm|rlm|nbsp|amp);'
+)
+_ENTITY_PATTERN = re.compile(u'&(lt|gt|lrm|rlm|nbsp|amp);')
+_ENTITIES = {
+    u'lt': u'<',
+    u'gt': u'>',
+    u'lrm': u'\u200e',
+    u'rlm': u'\u200f',
+    u'nbsp': u'\u00a0',
+    u'amp': u'&',
+}
+# The tags kept by the keep_styles mode, with the style they stand for
+_STYLE_TAGS = {
+    u'i': {u'italics': True},
+    u'b': {u'font-weight': u'bold'},
+    u'u': {u'text-decoration': u'underline'},
+    u'c': {},
+}
+
 
 def microseconds(h, m, s, f):
     return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000000 + int(f) * 1000
@@ -44,38 +75,209 @@ class WebVTTReader(BaseReader):
     def __init__(self, ignore_timing_errors=True, *args, **kwargs):
         """
         :param ignore_timing_errors: Whether to ignore timing checks
+        :param processes: If more than 1, the lines are split at blank lines
+            in this many chunks of cues, which are parsed in parallel by a
+            pool of processes
+        :param keep_styles: If True, the <i>, <b>, <u> and <c.class> tags are
+            kept as style nodes instead of being stripped off
         """
         super(WebVTTReader, self).__init__(
             ignore_timing_errors, *args, **kwargs
         )
         self.ignore_timing_errors = ignore_timing_errors
+        self.processes = kwargs.get('processes', 1)
+        self.keep_styles = kwargs.get('keep_styles', False)
 
     def detect(self, content):
         return u'WEBVTT' in content
 
-    def read(self, content, lang=u'en-US'):
-        if type(content) != unicode:
-            raise InvalidInputError('The content is not a unicode string.')
+    def read(self, content, lang=u'en-US', encoding=None):
+        """
+        :param content: unicode string, or raw content (see
+            pycaption.utils.get_raw_content) of which only the timing lines
+            and the text of the cues are decoded
+        :param encoding: the encoding of raw content
+        """
+        content, encoding = get_raw_content(content, encoding)
 
         caption_set = CaptionSet()
-        caption_set.set_captions(lang, self._parse(content.splitlines()))
+        if encoding is None:
+            lines = content.splitlines()
+        else:
+            lines = _iter_raw_lines(content, encoding)
+
+        chunks = self._split_in_chunks(lines)
+        if len(chunks) > 1:
+            captions = self._parse_chunks(chunks)
+        else:
+            # The raw lines are a generator, which the split may have read
+            captions = self._parse(chunks[0][1])
+        caption_set.set_captions(lang, captions)
 
         if caption_set.is_empty():
             raise CaptionReadNoCaptions(u"empty caption file")
 
         return caption_set
 
-    def _parse(self, lines):
+    def read_range(self, fp, cue_index, start, end, lang=u'en-US',
+                   encoding='utf-8'):
+        """
+        Read only the cues overlapping a time range, finding them with an
+        index of the cues of the file.
+
+        :param fp: the WebVTT file, opened in binary mode
+        :type cue_index: CueIndex
+        :param start: the start of the time range, in microseconds
+        :param end: the end of the time range, in microseconds
+        :returns: CaptionSet, empty if no cue overlaps the range
+        """
+        caption_set = CaptionSet()
+        content = u'\n\n'.join(
+            cue_index.read_cues(fp, start, end, encoding))
+        caption_set.set_captions(lang, self._parse(content.splitlines()))
+        return caption_set
+
+    def read_tail(self, fp, state=None, encoding='utf-8', final=False):
+        """
+        Read the cues appended to a growing file since the previous call, to
+        poll it during a live event. A trailing cue is held back until the
+        empty line ending it is written. The order of the cues is checked
+        across the calls.
+
+        :param fp: the WebVTT file, opened in binary mode
+        :type state: TailState
+        :param state: the state returned by the previous call, if any
+        :param final: If True, the file isn't growing anymore, and its last
+            cue is read even without an empty line after it
+        :returns: tuple (list of the new Captions, TailState to resume from)
+        """
+        state = state or TailState()
+        text, offset = read_appended_cues(fp, state, encoding, final)
+
+        lines = text.splitlines()
+        captions = list(self._iter_parse(
+            lines, state.line, last_start_time=state.last_start_time))
+        if captions:
+            last_start_time = captions[-1].start
+        else:
+            last_start_time = state.last_start_time
+
+        return captions, TailState(
+            offset, state.line + len(lines), last_start_time)
+
+    def _split_in_chunks(self, lines):
+        """
+        Split the lines in (at most) self.processes chunks of similar size,
+        right after blank lines, where the parser state is reset.
+
+        :param lines: iterable of lines
+        :returns: list of (index of the first line, lines) tuples
+        """
+        if not self.processes or self.processes < 2:
+            return [(0, lines)]
+
+        lines = list(lines)
+
+        chunk_size = -(-len(lines) // self.processes)
+        boundaries = [0]
+        for index in range(chunk_size, len(lines), chunk_size):
+            index = max(index, boundaries[-1])
+            while index < len(lines) and lines[index - 1] != u'':
+                index += 1
+            if index >= len(lines):
+                break
+            if index > boundaries[-1]:
+                boundaries.append(index)
+        boundaries.append(len(lines))
+
+        return [(start, lines[start:end])
+                for start, end in zip(boundaries, boundaries[1:])]
+
+    def _parse_chunks(self, chunks):
+        """
+        Parse the chunks of lines in a pool of processes, then check the
+        order of the cues across the chunks, which the processes can't do.
+
+        :type chunks: list
+        :returns: list of the Captions of all the chunks, in order
+        """
+        pool = Pool(min(self.processes, len(chunks)))
+        try:
+            results = pool.map(
+                _parse_webvtt_chunk,
+                [(self, first_line, lines) for first_line, lines in chunks]
+            )
+        finally:
+            pool.close()
+            pool.join()
+
         captions = []
+        for chunk_captions, error, first_timing in results:
+            # The errors are raised in the order a serial read finds them
+            if first_timing and captions and not self.ignore_timing_errors:
+                timing_line, caption = first_timing
+                try:
+                    self._validate_timings(caption, captions[-1].start)
+                except CaptionReadError as e:
+                    new_message = u'%s (line %d)' % (e.args[0], timing_line)
+                    raise type(e), new_message, sys.exc_info()[2]
+            if error is not None:
+                raise error
+            captions.extend(chunk_captions)
+
+        return captions
+
+    def iter_captions(self, source, metadata_handler=None):
+        """
+        Read the captions one at a time, as the lines of the source come, so
+        that files of any length can be read with constant memory.
+
+        :param source: unicode string, or iterable of unicode lines (e.g. a
+            file opened with io.open)
+        :param metadata_handler: If given, called with the index and the
+            text of each line outside of the cues (the header, NOTE blocks,
+            cue identifiers...), which are dropped otherwise
+        :returns: generator of Captions, each one yielded once the blank line
+            ending it is read
+        """
+        if isinstance(source, unicode):
+            lines = source.splitlines()
+        else:
+            lines = _iter_source_lines(source)
+
+        found_captions = False
+        for caption in self._iter_parse(lines, 0, metadata_handler):
+            found_captions = True
+            yield caption
+
+        if not found_captions:
+            raise CaptionReadNoCaptions(u"empty caption file")
+
+    def _parse(self, lines, first_line=0):
+        """
+        :param first_line: the index of the first line in the file, for the
+            error messages
+        """
+        return list(self._iter_parse(lines, first_line))
+
+    def _iter_parse(self, lines, first_line=0, metadata_handler=None,
+                    last_start_time=0):
+        """
+        :param first_line: the index of the first line in the file, for the
+            error messages
+        :param metadata_handler: called with the lines outside of the cues
+        :param last_start_time: the start of the cue before the lines, if any
+        :returns: generator of Captions
+        """
         caption = None
         found_timing = False
 
-        for i, line in enumerate(lines):
+        for i, line in enumerate(lines, first_line):
 
             if u'-->' in line:
                 found_timing = True
                 timing_line = i
-                last_start_time = captions[-1].start if captions else 0
+                open_styles = []
                 try:
                     caption = self._parse_timing_line(line, last_start_time)
                 except CaptionReadError as e:
@@ -89,22 +291,27 @@ class WebVTTReader(BaseReader):
                             u'Cue without content. (line %d)' % timing_line)
                     else:
                         found_timing = False
-                        captions.append(caption)
+                        last_start_time = caption.start
+                        _close_styles(caption, open_styles)
+                        yield caption
                         caption = None
             else:
                 if found_timing:
                     if not caption.is_empty():
                         caption.nodes.append(CaptionNode.create_break())
-                    caption.nodes.append(CaptionNode.create_text(
-                        self._decode(line)))
-                else:
-                    # it's a comment or some metadata; ignore it
-                    pass
+                    if self.keep_styles:
+                        caption.nodes.extend(
+                            self._decode_nodes(line, open_styles))
+                    else:
+                        caption.nodes.append(CaptionNode.create_text(
+                            self._decode(line)))
+                elif metadata_handler is not None:
+                    # it's a comment or some metadata
+                    metadata_handler(i, line)
 
         if caption and not caption.is_empty():
-            captions.append(caption)
-
-        return captions
+            _close_styles(caption, open_styles)
+            yield caption
 
     def _remove_styles(self, line):
         partial_result = VOICE_SPAN_PATTERN.sub(u'\\2: ', line)
@@ -163,10 +370,66 @@ class WebVTTReader(BaseReader):
 
     def _decode(self, s):
         """
-        Convert cue text from WebVTT XML-like format to plain unicode.
+        Convert cue text from WebVTT XML-like format to plain unicode, in a
+        single scan of it.
         :type s: unicode
         """
         s = s.strip()
+        if u'<' not in s and u'&' not in s:
+            return s
+
+        parts = []
+        position = 0
+        for match in _CUE_TEXT_TOKEN_PATTERN.finditer(s):
+            if _is_ambiguous_token(s, match):
+                return self._decode_in_passes(s)
+            parts.append(s[position:match.start()])
+            parts.append(_decode_token(match))
+            position = match.end()
+        parts.append(s[position:])
+
+        return u''.join(parts)
+
+    def _decode_nodes(self, s, open_styles):
+        """
+        Convert cue text from WebVTT XML-like format to CaptionNodes, keeping
+        the <i>, <b>, <u> and <c.class> tags as style nodes.
+
+        :type s: unicode
+        :param open_styles: list of the (tag name, style) of the style tags
+            opened (and not closed yet) in the previous lines of the cue
+        :returns: list of CaptionNodes
+        """
+        s = s.strip()
+        nodes = []
+        parts = []
+        position = 0
+        for match in _CUE_TEXT_TOKEN_PATTERN.finditer(s):
+            if _is_ambiguous_token(s, match):
+                return [CaptionNode.create_text(self._decode_in_passes(s))]
+            parts.append(s[position:match.start()])
+            position = match.end()
+
+            node = _create_style_node(match, open_styles)
+            if node is None:
+                parts.append(_decode_token(match))
+                continue
+            if any(parts):
+                nodes.append(CaptionNode.create_text(u''.join(parts)))
+            parts = []
+            nodes.append(node)
+        parts.append(s[position:])
+
+        if any(parts) or not nodes:
+            nodes.append(CaptionNode.create_text(u''.join(parts)))
+        return nodes
+
+    def _decode_in_passes(self, s):
+        """
+        Convert cue text from WebVTT XML-like format to plain unicode, as
+        _decode does when a single scan can't (see _is_ambiguous_token).
+        :type s: unicode
+        """
         # Covert voice span
         s = VOICE_SPAN_PATTERN.sub(u'\\2: ', s)
         # TODO: Add support for other WebVTT tags. For now just strip them
@@ -183,22 +446,180 @@ class WebVTTReader(BaseReader):
         return s
 
 
-class WebVTTWriter(BaseWriter):
+def _is_ambiguous_token(s, match):
+    """
+    The voice spans used to be converted, then the other tags stripped off,
+    then the entities decoded, each one in its own pass. A single scan gives
+    the same result unless a tag contains another '<' or comes right after
+    an '&' that could start an entity once the tag is gone.
+
+    :param s: the cue text
+    :param match: a match of _CUE_TEXT_TOKEN_PATTERN in it
+    """
+    if match.group(5) is not None:
+        return False
+    if u'<' in match.group()[1:]:
+        return True
+    before = s[max(0, match.start() - 5):match.start()]
+    return u'&' in before.rpartition(u';')[2]
+
+
+def _decode_token(match):
+    """
+    :param match: a match of _CUE_TEXT_TOKEN_PATTERN
+    :returns: the plain unicode the token stands for
+    """
+    if match.group(1) is not None:
+        # The voice span is converted to the name of the speaker
+        return _ENTITY_PATTERN.sub(_decode_entity, match.group(1)) + u': '
+    if match.group(5) is not None:
+        return _ENTITIES[match.group(5)]
+    return u''
+
+
+def _decode_entity(match):
+    return _ENTITIES[match.group(1)]
+
+
+def _create_style_node(match, open_styles):
+    """
+    :param match: a match of _CUE_TEXT_TOKEN_PATTERN
+    :param open_styles: list of the (tag name, style) of the style tags open
+    :returns: the style CaptionNode of an <i>, <b>, <u> or <c.class> tag, or
+        None for the other tokens
+    """
+    name = match.group(3)
+    attributes = match.group(4)
+    if name not in _STYLE_TAGS or attributes[:1] not in (u'', u'.', u' '):
+        return None
+
+    if match.group(2):
+        for i in range(len(open_styles) - 1, -1, -1):
+            if open_styles[i][0] == name:
+                return CaptionNode.create_style(False, open_styles.pop(i)[1])
+        return None
+
+    style = dict(_STYLE_TAGS[name])
+    classes = [c for c in attributes.split(u' ')[0].split(u'.') if c]
+    if classes:
+        style[u'class'] = classes[0]
+    if not style:
+        return None
+
+    open_styles.append((name, style))
+    return CaptionNode.create_style(True, style)
+
+
+def _close_styles(caption, open_styles):
+    """
+    Close the style tags left open at the end of a cue, which don't go on in
+    the next cues.
+
+    :type caption: Caption
+    :param open_styles: list of the (tag name, style) of the open style tags
+    """
+    while open_styles:
+        caption.nodes.append(
+            CaptionNode.create_style(False, open_styles.pop()[1]))
+
+
+def _parse_webvtt_chunk(args):
+    """
+    Runs WebVTTReader._parse in the processes of a pool. The errors are
+    returned, for the reader to raise them in order.
+
+    :returns: tuple (list of Captions or None, CaptionReadError or None,
+        (index, Caption) of the first timing line or None)
+    """
+    reader, first_line, lines = args
+
+    first_timing = None
+    for i, line in enumerate(lines, first_line):
+        if u'-->' in line:
+            try:
+                first_timing = (i, reader._parse_timing_line(line, 0))
+            except CaptionReadError:
+                # _parse finds this error again
+                pass
+            break
+
+    try:
+        return reader._parse(lines, first_line), None, first_timing
+    except CaptionReadError as e:
+        return None, e, first_timing
+
+
+def _iter_source_lines(source):
+    """
+    :param source: iterable of unicode lines, with or without line breaks
+    :returns: generator of the lines without line breaks
+    """
+    for line in source:
+        if type(line) != unicode:
+            raise InvalidInputError('The content is not a unicode string.')
+        yield line.rstrip(u'\r\n')
+
+
+def _iter_raw_lines(content, encoding):
+    """
+    Split raw content in lines for the parser, decoding only the lines of
+    the cues: their timing line and their text, which it reads. The other
+    lines (header, NOTE blocks, identifiers...) are replaced by
+    _UNDECODED_LINE, except the empty ones.
+
+    :param content: raw content, in an encoding compatible with ASCII
+    :returns: generator of unicode lines
+    """
+    in_cue = False
+    position = 0
+    while position < len(content):
+        match = _RAW_LINE_PATTERN.match(content, position)
+        position = match.end()
+        line = match.group(1)
+
+        if not in_cue and b'-->' not in line:
+            yield _UNDECODED_LINE if line else u''
+            continue
+
+        # The other line boundaries unicode.splitlines() knows of (e.g.
+        # u'\u2028') are only found once the line is decoded
+        for line in (line.decode(encoding) + u'\n').splitlines():
+            # The same test as the parser's for the start and end of a cue
+            if u'-->' in line:
+                in_cue = True
+            elif line == u'':
+                in_cue = False
+            yield line
+
+
+class WebVTTWriter(BaseSingleLanguageWriter):
     HEADER = u'WEBVTT\n\n'
     global_layout = None
     video_width = None
     video_height = None
 
+    def __init__(self, *args, **kwargs):
+        """
+        :param use_regions: If True, a REGION is defined in the header for
+            each distinct layout placing the cues, which reference it instead
+            of repeating its cue settings
+        """
+        self.use_regions = kwargs.pop(u'use_regions', False)
+        # The cue settings already rendered for each layout of the document
+        # being written
+        self._cue_settings = {}
+        # The cue settings of the cues placed by a region of the document
+        # being written (or None if no region places them), by layout and
+        # number of lines
+        self._region_cue_settings = {}
+        super(WebVTTWriter, self).__init__(*args, **kwargs)
+
     def write(self, caption_set):
         """
         :type caption_set: CaptionSet
         """
-        output = self.HEADER
-
         if caption_set.is_empty():
-            return output
-
-        caption_set = deepcopy(caption_set)
+            return self.HEADER
 
         # TODO: styles. These go into a separate CSS file, which doesn't really
         # fit the API here. Figure that out.  Though some style stuff can be
@@ -206,15 +627,105 @@ class WebVTTWriter(BaseWriter):
 
         # WebVTT's language support seems to be a bit crazy, so let's just
         # support a single one for now.
-        lang = caption_set.get_languages()[0]
+        lang = self._get_language(caption_set)
+
+        return self._write_language(caption_set, lang)
+
+    def _write_language(self, caption_set, lang):
+        """
+        :type caption_set: CaptionSet
+        :rtype: unicode
+        """
+        output = self.HEADER
 
         self.global_layout = caption_set.get_layout_info(lang)
 
         captions = caption_set.get_captions(lang)
 
+        self._cue_settings = {}
+        self._region_cue_settings = {}
+        if self.use_regions:
+            output += self._write_regions(captions)
+
         return output + u'\n'.join(
             [self._write_caption(caption) for caption in captions])
 
+    def _write_regions(self, captions):
+        """
+        Define a region for each distinct layout and number of lines of the
+        cues, which sets their position or their size. A cue is aligned with
+        the bottom of its region, so the region is exactly as high as it, to
+        keep the top of the cue where its layout places it.
+
+        :param captions: the captions to write
+        :returns: the REGION blocks
+        """
+        output = u''
+        # The ids of the regions by their settings, since layouts differing
+        # e.g. by their alignment only share a region
+        region_ids = {}
+        for caption in captions:
+            for cue_text, layout in self._iter_cues(caption):
+                if not layout or layout.webvtt_positioning:
+                    continue
+                key = layout, len(cue_text.splitlines())
+                if key in self._region_cue_settings:
+                    continue
+
+                self._region_cue_settings[key] = None
+                positioning = self._positioning_from(layout)
+                if positioning is None:
+                    continue
+                alignment, left_offset, top_offset, width = positioning
+                if not (left_offset or top_offset or width):
+                    continue
+
+                settings = self._region_settings(
+                    left_offset, top_offset, width, key[1])
+                if settings not in region_ids:
+                    region_ids[settings] = u'r{}'.format(len(region_ids))
+                    output += u'REGION\nid:{}\n{}\n'.format(
+                        region_ids[settings], settings)
+
+                cue_settings = u' region:' + region_ids[settings]
+                if alignment and alignment != u'middle':
+                    cue_settings += u' align:' + alignment
+                self._region_cue_settings[key] = cue_settings
+
+        return output
+
+    def _region_settings(self, left_offset, top_offset, width, lines):
+        """
+        :type left_offset: Size
+        :type top_offset: Size
+        :type width: Size
+        :returns: the settings of a REGION block, but its id
+        :rtype: unicode
+        """
+        # Without extent, the region goes until the right edge of the video
+        if not width:
+            width = Size(100, UnitEnum.PERCENT)
+            if left_offset:
+                width -= left_offset
+
+        left_offset = unicode(left_offset) if left_offset else u'0%'
+        # Without top offset, the region sits at the bottom of the video,
+        # where a cue without line setting goes
+        if top_offset:
+            region_anchor = u'0%,0%'
+            viewport_anchor = left_offset + u',' + unicode(top_offset)
+        else:
+            region_anchor = u'0%,100%'
+            viewport_anchor = left_offset + u',100%'
+
+        return (
+            u'width:{}\n'
+            u'lines:{}\n'
+            u'regionanchor:{}\n'
+            u'viewportanchor:{}\n'.format(
+                unicode(width), lines, region_anchor, viewport_anchor)
+        )
+
     def _timestamp(self, ts):
         ts = float(ts) / 1000000
         hours = int(ts) / 60 / 60
@@ -229,27 +740,36 @@ class WebVTTWriter(BaseWriter):
         """
         :type caption: Caption
         """
-        layout_groups = self._layout_groups(caption.nodes)
-
         start = self._timestamp(caption.start)
         end = self._timestamp(caption.end)
         timespan = u"{} --> {}".format(start, end)
 
         output = u''
 
-        for cue_text, layout in layout_groups:
-            if not layout:
-                layout = caption.layout_info or self.global_layout
-            cue_settings = self._cue_settings_from(layout)
+        for cue_text, layout in self._iter_cues(caption):
+            cue_settings = self._cue_settings_from(
+                layout, len(cue_text.splitlines()))
             output += timespan + cue_settings + u'\n'
             output += cue_text + u'\n'
 
         return output
 
-    def _cue_settings_from(self, layout):
+    def _iter_cues(self, caption):
+        """
+        :type caption: Caption
+        :returns: generator of (cue text, Layout) tuples, one for each
+            WebVTT cue the caption is written as
+        """
+        for cue_text, layout in self._layout_groups(caption.nodes):
+            if not layout:
+                layout = caption.layout_info or self.global_layout
+            yield cue_text, layout
+
+    def _cue_settings_from(self, layout, lines=1):
         """
         Return WebVTT cue settings string based on layout info
         :type layout: Layout
+        :param lines: the number of lines of the cue
         :rtype: unicode
         """
         if not layout:
@@ -260,6 +780,51 @@ class WebVTTWriter(BaseWriter):
         if layout.webvtt_positioning:
             return u' {}'.format(layout.webvtt_positioning)
 
+        # The cues placed by a region only reference it
+        cue_settings = self._region_cue_settings.get((layout, lines))
+        if cue_settings is not None:
+            return cue_settings
+
+        # A file usually has only a few distinct layouts (e.g. the positions
+        # of the SCC grid), so each one is rendered only once
+        key = (layout, self.relativize, self.video_width, self.video_height,
+               self.fit_to_screen)
+        cue_settings = self._cue_settings.get(key)
+        if cue_settings is None:
+            cue_settings = self._render_cue_settings(layout)
+            self._cue_settings[key] = cue_settings
+        return cue_settings
+
+    def _render_cue_settings(self, layout):
+        """
+        :type layout: Layout
+        :rtype: unicode
+        """
+        positioning = self._positioning_from(layout)
+        if positioning is None:
+            return u''
+        alignment, left_offset, top_offset, cue_width = positioning
+
+        cue_settings = u''
+
+        if alignment and alignment != u'middle':
+            cue_settings += u" align:" + alignment
+
+        if left_offset:
+            cue_settings += u" position:{},start".format(unicode(left_offset))
+        if top_offset:
+            cue_settings += u" line:" + unicode(top_offset)
+        if cue_width:
+            cue_settings += u" size:" + unicode(cue_width)
+
+        return cue_settings
+
+    def _positioning_from(self, layout):
+        """
+        :type layout: Layout
+        :returns: tuple (alignment, left offset, top offset, cue width), or
+            None if the positioning of the layout has to be ignored
+        """
         left_offset = None
         top_offset = None
         cue_width = None
@@ -273,7 +838,7 @@ class WebVTTWriter(BaseWriter):
                 # There are absolute positioning values for this cue but the
                 # Writer is explicitly configured not to do any relativization.
                 # Ignore all positioning for this cue.
-                return u''
+                return None
 
         # Ensure that all positioning values are measured using percentage.
         # This may raise an exception if layout.is_relative() == False
@@ -322,18 +887,7 @@ class WebVTTWriter(BaseWriter):
         except (AttributeError, KeyError):
             pass
 
-        cue_settings = u''
-
-        if alignment and alignment != u'middle':
-            cue_settings += u" align:" + alignment
-        if left_offset:
-            cue_settings += u" position:{},start".format(unicode(left_offset))
-        if top_offset:
-            cue_settings += u" line:" + unicode(top_offset)
-        if cue_width:
-            cue_settings += u" size:" + unicode(cue_width)
-
-        return cue_settings
+        return alignment, left_offset, top_offset, cue_width
 
     def _layout_groups(self, nodes):
         """
@@ -995,3 +995,40 @@ DFXP_WITH_TEMPLATED_STYLE = """\
 </body>
 </tt>
 """
+
+SAMPLE_DFXP_MULTI_LANG = """\
+<?xml version="1.0" encoding="utf-8"?>
+<tt xml:lang="en" xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+ <head>
+  <layout>
+  <region tts:displayAlign="after" tts:textAlign="center" xml:id="bottom"></region>
+  <region tts:displayAlign="before" tts:textAlign="left" xml:id="top"></region>
+  </layout>
+ </head>
+ <body>
+  <div xml:lang="en-US" region="bottom">
+   <p begin="00:00:09.209" end="00:00:12.312">
+    ( clock ticking )
+   </p>
+   <p begin="00:00:14.848" end="00:00:17.000" region="top">
+    MAN:<br/>
+    When we think
+   </p>
+  </div>
+  <div xml:lang="fr-FR" region="bottom">
+   <p begin="00:00:09.209" end="00:00:12.312">
+    ( tic-tac )
+   </p>
+   <p begin="00:00:14.848" end="00:00:17.000" region="top">
+    HOMME:<br/>
+    Quand on pense
+   </p>
+  </div>
+  <div xml:lang="de-DE" region="bottom">
+   <p begin="00:00:09.209" end="00:00:12.312">
+    ( Uhr tickt )
+   </p>
+  </div>
+ </body>
+</tt>"""
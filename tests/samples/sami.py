@@ -335,3 +335,45 @@ SAMPLE_SAMI_WITH_LANG = u"""
 </body>
 </sami>
 """
+
+SAMPLE_SAMI_MULTI_LANG = u"""
+<SAMI><HEAD><TITLE>NOVA3213</TITLE><STYLE TYPE="text/css">
+<!--
+P { margin-left:  1pt;
+    margin-right: 1pt;
+    margin-bottom: 2pt;
+    margin-top: 2pt;
+    text-align: center;
+    font-size: 10pt;
+    font-family: Arial;
+    color: #ffeedd; }
+
+.ENCC {Name: English; lang: en-US; SAMI_Type: CC;}
+.FRCC {Name: French; lang: fr-FR; SAMI_Type: CC;}
+.DECC {Name: German; lang: de-DE; SAMI_Type: CC;}
+
+--></STYLE></HEAD><BODY>
+<SYNC start="9209"><P class="ENCC">
+       ( clock ticking )
+</P><P class="FRCC">
+       ( tic-tac )
+</P><P class="DECC">
+       ( Uhr tickt )
+</P></SYNC>
+<SYNC start="12312"><P class="ENCC">&nbsp;</P></SYNC>
+<SYNC start="14848"><P class="ENCC">
+    MAN:<br/>
+    When we think
+</P><P class="DECC">
+    MANN:<br/>
+    Wenn wir denken
+</P></SYNC>
+<SYNC start="16000"><P class="FRCC">
+    HOMME:<br/>
+    Quand on pense
+</P></SYNC>
+<SYNC start="17000"><P class="ENCC">
+    we have this vision of Einstein
+</P></SYNC>
+</BODY></SAMI>
+"""
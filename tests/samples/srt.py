@@ -106,3 +106,26 @@ STD  OUT
 
 SAMPLE_SRT_EMPTY = u"""
 """
+
+SAMPLE_SRT_CRLF_WITHOUT_INDICES = (
+    u"00:00:09,209 --> 00:00:12,312\r\n"
+    u"( clock ticking )\r\n"
+    u"\r\n"
+    u"\r\n"
+    u"00:00:14.848 --> 00:00:17.000\r\n"
+    u"MAN:\r\n"
+    u"When we think\r\n"
+    u"\r\n"
+    u"3\r\n"
+    u"00:00:17 --> 00:00:18,752\r\n"
+    u"we have this vision of Einstein\r\n"
+)
+
+SAMPLE_SRT_INVALID_TIMING = u"""1
+00:00:09,209 --> 00:00:12,312
+( clock ticking )
+
+2
+00:00:14,848 -> 00:00:17,000
+MAN:
+"""
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pycaption import CueIndex, SRTReader, WebVTTReader
+
+from .samples.srt import SAMPLE_SRT
+from .samples.webvtt import SAMPLE_WEBVTT
+
+
+class CueIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write_file(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        return path
+
+    def _assert_reads_range(self, reader, content, path, start, end):
+        expected = [
+            (c.start, c.end, c.get_text())
+            for c in reader.read(content).get_captions(u'en-US')
+            if c.start < end and c.end > start
+        ]
+
+        with open(path, 'rb') as f:
+            captions = reader.read_range(
+                f, CueIndex.build(path), start, end)
+
+        self.assertEqual(
+            expected,
+            [(c.start, c.end, c.get_text())
+             for c in captions.get_captions(u'en-US')])
+
+    def test_srt_read_range(self):
+        path = self._write_file('captions.srt', SAMPLE_SRT)
+
+        self.assertEqual(7, len(CueIndex.build(path)))
+        self._assert_reads_range(
+            SRTReader(), SAMPLE_SRT, path, 15000000, 19000000)
+
+    def test_webvtt_read_range(self):
+        path = self._write_file('captions.vtt', SAMPLE_WEBVTT)
+
+        self.assertEqual(7, len(CueIndex.build(path)))
+        self._assert_reads_range(
+            WebVTTReader(), SAMPLE_WEBVTT, path, 17000000, 21000000)
+
+    def test_range_without_cues(self):
+        path = self._write_file('captions.srt', SAMPLE_SRT)
+
+        self.assertEqual([], CueIndex.build(path).find(0, 9000000))
+
+    def test_save_and_load(self):
+        path = self._write_file('captions.srt', SAMPLE_SRT)
+        index = CueIndex.build(path)
+        index_path = os.path.join(self.directory, 'captions.srt.idx')
+
+        index.save(index_path)
+
+        self.assertEqual(
+            index.entries, CueIndex.load(index_path, path).entries)
+
+    def test_load_rebuilds_index_of_changed_file(self):
+        path = self._write_file('captions.srt', SAMPLE_SRT)
+        index_path = os.path.join(self.directory, 'captions.srt.idx')
+        old_index = CueIndex.build(path)
+        old_index.save(index_path)
+
+        # The cues all move by a byte
+        self._write_file('captions.srt', u'\n' + SAMPLE_SRT)
+        index = CueIndex.load(index_path, path)
+
+        self.assertNotEqual(old_index.entries, index.entries)
+        self.assertEqual(CueIndex.build(path).entries, index.entries)
@@ -4,7 +4,8 @@ from pycaption import DFXPReader, CaptionReadNoCaptions
 from pycaption.exceptions import CaptionReadSyntaxError
 
 from .samples.dfxp import (
-    SAMPLE_DFXP, SAMPLE_DFXP_EMPTY, SAMPLE_DFXP_SYNTAX_ERROR)
+    SAMPLE_DFXP, SAMPLE_DFXP_EMPTY, SAMPLE_DFXP_SYNTAX_ERROR,
+    SAMPLE_DFXP_MULTI_LANG)
 
 
 class DFXPReaderTestCase(unittest.TestCase):
@@ -32,6 +33,22 @@ class DFXPReaderTestCase(unittest.TestCase):
         captions = DFXPReader().read(SAMPLE_DFXP_SYNTAX_ERROR)
         self.assertEquals(2, len(captions.get_captions(u"en-US")))
 
+    def test_languages_filter(self):
+        captions = DFXPReader().read(
+            SAMPLE_DFXP_MULTI_LANG, languages=[u'fr-FR'])
+
+        self.assertEquals([u'fr-FR'], captions.get_languages())
+        self.assertEquals(2, len(captions.get_captions(u'fr-FR')))
+        self.assertEquals(
+            captions.get_captions(u'fr-FR')[1].layout_info,
+            DFXPReader().read(SAMPLE_DFXP_MULTI_LANG)
+            .get_captions(u'fr-FR')[1].layout_info)
+
+    def test_languages_filter_without_matches(self):
+        self.assertRaises(
+            CaptionReadNoCaptions,
+            DFXPReader().read, SAMPLE_DFXP_MULTI_LANG, languages=[u'es-ES'])
+
     def test_caption_error_for_invalid_positioning_values(self):
         invalid_value_dfxp = (
             SAMPLE_DFXP_INVALID_POSITIONING_VALUE_TEMPLATE
@@ -3,7 +3,9 @@ import unittest
 from bs4 import BeautifulSoup
 
 from pycaption import (
-    DFXPReader, DFXPWriter, SRTWriter, SAMIWriter, WebVTTWriter)
+    DFXPReader, DFXPWriter, SRTWriter, SAMIWriter, WebVTTWriter,
+    Caption, CaptionSet, CaptionNode)
+from pycaption.geometry import Layout, Point, Size, UnitEnum
 
 from pycaption.dfxp.extras import LegacyDFXPWriter
 
@@ -22,7 +24,7 @@ from .samples.dfxp import (
     SAMPLE_DFXP_OUTPUT, SAMPLE_DFXP_STYLE_TAG_WITH_NO_XML_ID_INPUT,
     SAMPLE_DFXP_STYLE_TAG_WITH_NO_XML_ID_OUTPUT,
     SAMPLE_DFXP_LONG_CUE_FIT_TO_SCREEN, SAMPLE_DFXP_FOR_LEGACY_WRITER_INPUT,
-SAMPLE_DFXP_FOR_LEGACY_WRITER_OUTPUT
+SAMPLE_DFXP_FOR_LEGACY_WRITER_OUTPUT, SAMPLE_DFXP_MULTI_LANG
 )
 from .samples.sami import SAMPLE_SAMI
 from .samples.srt import SAMPLE_SRT
@@ -69,6 +71,22 @@ class DFXPtoDFXPTestCase(unittest.TestCase, DFXPTestingMixIn):
         for p in soup.find_all(u'p'):
             self.assertEquals(p.attrs.get(u'style'), 'p')
 
+    def test_identical_caption_styles_are_written_alike(self):
+        caption_set = DFXPReader().read(SAMPLE_DFXP)
+        result = DFXPWriter().write(caption_set)
+
+        soup = BeautifulSoup(result, u'xml')
+        self.assertEquals(
+            [u'p'], [style[u'xml:id'] for style in soup.find_all(u'style')])
+        for p in soup.find_all(u'p'):
+            self.assertEquals(
+                {u'style': u'p', u'region': u'bottom'},
+                dict((name, value) for name, value in p.attrs.items()
+                     if name not in (u'begin', u'end')))
+        self.assertEquals(
+            [{u'region': u'r0', u'tts:textAlign': u'right'}],
+            [span.attrs for span in soup.find_all(u'span')])
+
     def test_default_region_tag(self):
         caption_set = DFXPReader().read(SAMPLE_DFXP)
         result = DFXPWriter().write(caption_set)
@@ -141,6 +159,54 @@ class DFXPtoDFXPTestCase(unittest.TestCase, DFXPTestingMixIn):
         result = DFXPWriter().write(caption_set)
         self.assertEqual(result, SAMPLE_DFXP_LONG_CUE_FIT_TO_SCREEN)
 
+    def test_region_precision_merges_near_identical_regions(self):
+        caption_set = CaptionSet()
+        captions = []
+        for i, x in enumerate([53.333333, 53.33, 20]):
+            layout = Layout(origin=Point(Size(x, UnitEnum.PERCENT),
+                                         Size(80, UnitEnum.PERCENT)))
+            caption = Caption(layout_info=layout)
+            caption.start = i * 1000000
+            caption.end = (i + 1) * 1000000
+            caption.nodes = [CaptionNode.create_text(u'Caption', layout)]
+            captions.append(caption)
+        caption_set.set_captions(u'en-US', captions)
+
+        exact = DFXPWriter().write(caption_set)
+        rounded = DFXPWriter(region_precision=2).write(caption_set)
+
+        exact_regions = BeautifulSoup(exact, u'xml').find_all(u'region')
+        rounded_soup = BeautifulSoup(rounded, u'xml')
+        rounded_regions = rounded_soup.find_all(u'region')
+        self.assertEqual(len(exact_regions), 4)
+        self.assertEqual(len(rounded_regions), 3)
+
+        region_ids = [p[u'region'] for p in rounded_soup.find_all(u'p')]
+        self.assertEqual(region_ids[0], region_ids[1])
+        self.assertNotEqual(region_ids[1], region_ids[2])
+
+    def test_compact_output(self):
+        caption_set = DFXPReader().read(SAMPLE_DFXP)
+        pretty = DFXPWriter().write(caption_set)
+        compact = DFXPWriter(compact=True).write(caption_set)
+
+        self.assertTrue(isinstance(compact, unicode))
+        self.assertTrue(len(compact) < len(pretty))
+        self.assertNotIn(u'>\n', compact.split(u'\n', 1)[1])
+        self.assertEqual(pretty.count(u'<br/>'), compact.count(u'<br/>'))
+
+    def test_compact_output_round_trip(self):
+        caption_set = DFXPReader().read(SAMPLE_DFXP)
+        compact = DFXPWriter(compact=True).write(caption_set)
+        result = DFXPReader().read(compact)
+
+        for lang in caption_set.get_languages():
+            expected = [(c.start, c.end, c.get_text())
+                        for c in caption_set.get_captions(lang)]
+            actual = [(c.start, c.end, c.get_text())
+                      for c in result.get_captions(lang)]
+            self.assertEqual(expected, actual)
+
 
 class DFXPtoSRTTestCase(unittest.TestCase, SRTTestingMixIn):
 
@@ -150,6 +216,15 @@ class DFXPtoSRTTestCase(unittest.TestCase, SRTTestingMixIn):
         self.assertTrue(isinstance(results, unicode))
         self.assertSRTEquals(SAMPLE_SRT, results)
 
+    def test_languages_are_written_in_document_order(self):
+        caption_set = DFXPReader().read(SAMPLE_DFXP_MULTI_LANG)
+        results = SRTWriter().write(caption_set)
+
+        self.assertEqual(
+            [u'( clock ticking )', u'( tic-tac )', u'( Uhr tickt )'],
+            [part.split(u'\n')[2]
+             for part in results.split(u'MULTI-LANGUAGE SRT\n')])
+
 
 class DFXPtoSAMITestCase(unittest.TestCase, SAMITestingMixIn):
 
@@ -179,6 +254,15 @@ class DFXPtoWebVTTTestCase(unittest.TestCase, WebVTTTestingMixIn):
         self.assertTrue(isinstance(results, unicode))
         self.assertWebVTTEquals(SAMPLE_WEBVTT_FROM_DFXP, results)
 
+    def test_first_language_of_document_is_written(self):
+        caption_set = DFXPReader().read(SAMPLE_DFXP_MULTI_LANG)
+        results = WebVTTWriter().write(caption_set)
+
+        self.assertEqual([u'en-US', u'fr-FR', u'de-DE'],
+                         caption_set.get_languages())
+        self.assertIn(u'( clock ticking )', results)
+        self.assertNotIn(u'( Uhr tickt )', results)
+
     def test_dfxp_with_positioning_to_webvtt_conversion(self):
         caption_set = DFXPReader().read(
             SAMPLE_DFXP_WITH_POSITIONING.decode('utf-8'))
@@ -214,3 +298,16 @@ class LegacyDFXPTestCase(unittest.TestCase):
         result = LegacyDFXPWriter().write(caption_set)
 
         self.assertEqual(result, SAMPLE_DFXP_FOR_LEGACY_WRITER_OUTPUT)
+
+    def test_legacy_convert_compact(self):
+        caption_set = DFXPReader(read_invalid_positioning=True).read(
+            SAMPLE_DFXP_FOR_LEGACY_WRITER_INPUT)
+
+        result = LegacyDFXPWriter(compact=True).write(caption_set)
+
+        self.assertTrue(
+            len(result) < len(SAMPLE_DFXP_FOR_LEGACY_WRITER_OUTPUT))
+        self.assertEqual(
+            [c.get_text() for c in DFXPReader().read(result)
+                .get_captions(u'en-US')],
+            [c.get_text() for c in caption_set.get_captions(u'en-US')])
@@ -117,6 +117,28 @@ class SinglePositioningDFXPWRiterTestCase(unittest.TestCase):
         for _, style in caption_set.get_styles():
             self.assertFalse('text-align' in style)
 
+    def test_caption_set_is_not_modified(self):
+        caption_set = DFXPReader().read(
+            SAMPLE_DFXP_TO_RENDER_WITH_ONLY_DEFAULT_POSITIONING_INPUT)
+        captions = caption_set.get_captions(u'en-US')
+        layouts = [(c.layout_info, [n.layout_info for n in c.nodes])
+                   for c in captions]
+        styles = deepcopy(dict(caption_set.get_styles()))
+
+        new_region = Layout(
+            alignment=Alignment(
+                HorizontalAlignmentEnum.LEFT, VerticalAlignmentEnum.TOP
+            )
+        )
+        SinglePositioningDFXPWriter(new_region).write(caption_set)
+
+        self.assertEqual(caption_set.get_captions(u'en-US'), captions)
+        self.assertEqual(
+            [(c.layout_info, [n.layout_info for n in c.nodes])
+             for c in captions],
+            layouts)
+        self.assertEqual(dict(caption_set.get_styles()), styles)
+
 
 class LegacyDFXPWriterTestCase(unittest.TestCase):
     def test_default_style_is_written_to_output_file(self):
@@ -126,3 +148,15 @@ class LegacyDFXPWriterTestCase(unittest.TestCase):
         result = LegacyDFXPWriter().write(caption_set)
 
         self.assertEqual(result.count('foxy_the_squirrel'), 2)
+
+    def test_caption_set_is_not_modified(self):
+        caption_set = DFXPReader(read_invalid_positioning=True).read(
+            DFXP_WITH_TEMPLATED_STYLE.format(style_name="foxy_the_squirrel"))
+        captions = caption_set.get_captions(u'en-US')
+        caption_styles = deepcopy([c.style for c in captions])
+        self.assertTrue(caption_styles)
+
+        LegacyDFXPWriter().write(caption_set)
+
+        self.assertEqual(caption_set.get_captions(u'en-US'), captions)
+        self.assertEqual([c.style for c in captions], caption_styles)
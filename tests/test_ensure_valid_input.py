@@ -2,7 +2,7 @@ import unittest
 
 from pycaption import DFXPReader, SAMIReader, SCCReader, SRTReader, WebVTTReader
 
-from pycaption.exceptions import InvalidInputError
+from pycaption.exceptions import InvalidInputError, CaptionReadNoCaptions
 
 class ReaderTestCase(unittest.TestCase):
 
@@ -25,3 +25,7 @@ class ReaderTestCase(unittest.TestCase):
     def test_webvtt_reader_only_supports_unicode_input(self):
         with self.assertRaises(InvalidInputError):
             WebVTTReader().read('')
+
+    def test_srt_reader_supports_bytes_with_declared_encoding(self):
+        with self.assertRaises(CaptionReadNoCaptions):
+            SRTReader().read('', encoding='utf-8')
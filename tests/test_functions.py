@@ -1,8 +1,9 @@
 import unittest
 
-from pycaption import DFXPReader
+from pycaption import CaptionConverter, DFXPReader
 from pycaption.base import merge_concurrent_captions
-from .samples.dfxp import DFXP_WITH_CONCURRENT_CAPTIONS
+from .samples.dfxp import (
+    DFXP_WITH_CONCURRENT_CAPTIONS, SAMPLE_DFXP_MULTI_LANG)
 
 
 class FunctionsTestCase(unittest.TestCase):
@@ -15,3 +16,8 @@ class FunctionsTestCase(unittest.TestCase):
         caption_set = merge_concurrent_captions(caption_set)
         captions = caption_set.get_captions('en-US')
         self.assertEqual(len(captions), 3)
+
+    def test_converter_reads_only_the_requested_languages(self):
+        converter = CaptionConverter().read(
+            SAMPLE_DFXP_MULTI_LANG, DFXPReader(), languages=[u'de-DE'])
+        self.assertEqual(converter.captions.get_languages(), [u'de-DE'])
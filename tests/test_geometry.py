@@ -122,3 +122,22 @@ class IsRelativeTestCase(unittest.TestCase):
         self.assertFalse(layout_abs.is_relative())
         self.assertFalse(layout_mix.is_relative())
         self.assertTrue(layout_rel.is_relative())
+
+
+class RoundedTestCase(unittest.TestCase):
+
+    def test_layouts_differing_by_rounding_artefacts_are_equal(self):
+        layout_1 = Layout(
+            origin=Point(Size(53.333333, UnitEnum.PERCENT),
+                         Size(10, UnitEnum.PERCENT)),
+            padding=Padding(start=Size(1.004, UnitEnum.PERCENT))
+        )
+        layout_2 = Layout(
+            origin=Point(Size(53.33, UnitEnum.PERCENT),
+                         Size(10, UnitEnum.PERCENT)),
+            padding=Padding(start=Size(1, UnitEnum.PERCENT))
+        )
+
+        self.assertNotEqual(layout_1, layout_2)
+        self.assertEqual(layout_1.rounded(2), layout_2.rounded(2))
+        self.assertEqual(hash(layout_1.rounded(2)), hash(layout_2.rounded(2)))
@@ -0,0 +1,97 @@
+import unittest
+
+from pycaption import (
+    HLSWebVTTWriter, SRTReader, WebVTTReader, WebVTTWriter, CaptionSet)
+from pycaption.geometry import Layout, Point, Size, UnitEnum
+
+from .samples.srt import SAMPLE_SRT
+
+
+class HLSWebVTTWriterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.caption_set = SRTReader().read(SAMPLE_SRT)
+
+    def _read_cues(self, segment):
+        return [
+            (c.start, c.end, c.get_text())
+            for c in WebVTTReader().read(segment).get_captions(u'en-US')
+        ]
+
+    def test_cues_are_written_in_every_segment_they_overlap(self):
+        writer = HLSWebVTTWriter(segment_duration=10, mpegts=900000)
+        files = list(writer.write_segments(self.caption_set))
+
+        self.assertEqual(
+            [u'segment0.vtt', u'segment1.vtt', u'segment2.vtt',
+             u'segment3.vtt', u'playlist.m3u8'],
+            [name for name, _ in files])
+
+        cues = []
+        for index, (name, content) in enumerate(files[:-1]):
+            self.assertTrue(content.startswith(
+                u'WEBVTT\nX-TIMESTAMP-MAP=MPEGTS:900000,LOCAL:00:00:00.000\n'))
+            segment_cues = self._read_cues(content)
+            for start, end, text in segment_cues:
+                self.assertTrue(start < (index + 1) * 10000000)
+                self.assertTrue(end > index * 10000000)
+            cues.extend(c for c in segment_cues if c not in cues)
+
+        self.assertEqual(
+            [(c.start, c.end, c.get_text())
+             for c in self.caption_set.get_captions(u'en-US')],
+            cues)
+        # The first cue goes from 9.209s to 12.312s
+        self.assertEqual(cues[0], self._read_cues(files[1][1])[0])
+
+    def test_playlist(self):
+        writer = HLSWebVTTWriter(segment_duration=15)
+        files = list(writer.write_segments(self.caption_set, duration=40))
+
+        self.assertEqual(
+            u'#EXTM3U\n'
+            u'#EXT-X-VERSION:3\n'
+            u'#EXT-X-TARGETDURATION:15\n'
+            u'#EXT-X-MEDIA-SEQUENCE:0\n'
+            u'#EXT-X-PLAYLIST-TYPE:VOD\n'
+            u'#EXTINF:15.000,\n'
+            u'segment0.vtt\n'
+            u'#EXTINF:15.000,\n'
+            u'segment1.vtt\n'
+            u'#EXTINF:10.000,\n'
+            u'segment2.vtt\n'
+            u'#EXT-X-ENDLIST\n',
+            files[-1][1])
+
+    def test_empty_caption_set(self):
+        files = list(HLSWebVTTWriter().write_segments(CaptionSet()))
+
+        self.assertEqual([u'playlist.m3u8'], [name for name, _ in files])
+
+    def test_writes_the_first_language_like_webvtt_writer(self):
+        caption_set = CaptionSet()
+        caption_set.set_captions(
+            u'fr', self.caption_set.get_captions(u'en-US')[3:])
+        caption_set.set_captions(
+            u'en-US', self.caption_set.get_captions(u'en-US'))
+        writer = HLSWebVTTWriter(segment_duration=60)
+
+        files = list(writer.write_segments(caption_set))
+
+        self.assertEqual([u'fr', u'en-US'], caption_set.get_languages())
+        self.assertEqual(
+            self._read_cues(WebVTTWriter().write(caption_set)),
+            self._read_cues(files[0][1]))
+        self.assertEqual(4, len(self._read_cues(files[0][1])))
+
+    def test_segments_reference_no_region(self):
+        self.caption_set.set_layout_info(u'en-US', Layout(origin=Point(
+            Size(20, UnitEnum.PERCENT), Size(80, UnitEnum.PERCENT))))
+        writer = HLSWebVTTWriter(use_regions=True)
+        self.assertIn(u' region:r0', writer.write(self.caption_set))
+
+        files = list(writer.write_segments(self.caption_set))
+
+        for name, content in files[:-1]:
+            self.assertNotIn(u'region:', content)
+            self.assertIn(u' position:20%,start line:80%', content)
@@ -1,12 +1,16 @@
 import unittest
+from io import StringIO
 
-from pycaption import SAMIReader, CaptionReadNoCaptions
+from pycaption import SAMIReader, DFXPWriter, CaptionReadNoCaptions
+from pycaption import sami
+from pycaption.sami import SAMIParser
 
 from .samples.sami import (
     SAMPLE_SAMI, SAMPLE_SAMI_EMPTY, SAMPLE_SAMI_SYNTAX_ERROR,
     SAMPLE_SAMI_PARTIAL_MARGINS, SAMPLE_SAMI_WITH_BAD_SPAN_ALIGN,
     SAMPLE_SAMI_WITH_BAD_DIV_ALIGN, SAMPLE_SAMI_WITH_P_ALIGN,
-    SAMPLE_SAMI_WITH_P_AND_SPAN_ALIGN
+    SAMPLE_SAMI_WITH_P_AND_SPAN_ALIGN, SAMPLE_SAMI_MULTI_LANG,
+    SAMPLE_SAMI_WITH_SPAN, SAMPLE_SAMI_DOUBLE_BR
 )
 
 class SAMIReaderTestCase(unittest.TestCase):
@@ -26,6 +30,15 @@ class SAMIReaderTestCase(unittest.TestCase):
         self.assertEquals(17000000, paragraph.start)
         self.assertEquals(18752000, paragraph.end)
 
+    def test_languages_filter(self):
+        captions = SAMIReader().read(
+            SAMPLE_SAMI_MULTI_LANG, languages=[u'en-US', u'de-DE'])
+
+        self.assertEquals(
+            set([u'en-US', u'de-DE']), set(captions.get_languages()))
+        self.assertEquals(3, len(captions.get_captions(u"en-US")))
+        self.assertEquals(2, len(captions.get_captions(u"de-DE")))
+
     def test_6digit_color_code_from_6digit_input(self):
         captions = SAMIReader().read(SAMPLE_SAMI)
         p_style = captions.get_style(u"p")
@@ -78,3 +91,103 @@ class SAMIReaderTestCase(unittest.TestCase):
         caption_set = SAMIReader().read(SAMPLE_SAMI_WITH_P_AND_SPAN_ALIGN)
         caption = caption_set.get_captions('en-US')[0]
         self.assertEquals(caption.layout_info.alignment.horizontal, u'right')
+
+    def test_single_pass_matches_default_reading(self):
+        for sample in [SAMPLE_SAMI, SAMPLE_SAMI_MULTI_LANG,
+                       SAMPLE_SAMI_WITH_SPAN, SAMPLE_SAMI_DOUBLE_BR,
+                       SAMPLE_SAMI_WITH_P_AND_SPAN_ALIGN]:
+            expected = DFXPWriter(video_width=640, video_height=360).write(
+                SAMIReader().read(sample))
+            result = DFXPWriter(video_width=640, video_height=360).write(
+                SAMIReader(single_pass=True).read(sample))
+
+            self.assertEquals(expected, result)
+
+    def test_parallel_read_matches_serial_read(self):
+        for sample in [SAMPLE_SAMI, SAMPLE_SAMI_MULTI_LANG]:
+            expected = SAMIReader().read(sample)
+            result = SAMIReader(processes=2).read(sample)
+
+            self.assertEquals(
+                expected.get_languages(), result.get_languages())
+            self.assertEquals(
+                DFXPWriter(video_width=640, video_height=360).write(expected),
+                DFXPWriter(video_width=640, video_height=360).write(result))
+            for lang in expected.get_languages():
+                self.assertEquals(
+                    [(c.start, c.end) for c in expected.get_captions(lang)],
+                    [(c.start, c.end) for c in result.get_captions(lang)])
+
+    def test_single_pass_languages_filter(self):
+        captions = SAMIReader(single_pass=True).read(
+            SAMPLE_SAMI_MULTI_LANG, languages=[u'fr-FR'])
+
+        self.assertEquals([u'fr-FR'], captions.get_languages())
+        self.assertEquals(
+            9209000, captions.get_captions(u'fr-FR')[0].start)
+
+    def test_iter_captions_matches_read(self):
+        read_chunk_size = sami._READ_CHUNK_SIZE
+        # Small chunks split the tags and the fixed markup
+        sami._READ_CHUNK_SIZE = 3
+        try:
+            for sample in [SAMPLE_SAMI, SAMPLE_SAMI_MULTI_LANG]:
+                expected = SAMIReader().read(sample)
+                result = {}
+                for lang, caption in SAMIReader().iter_captions(
+                        StringIO(sample)):
+                    result.setdefault(lang, []).append(caption)
+
+                self.assertEquals(
+                    sorted(expected.get_languages()), sorted(result))
+                for lang in expected.get_languages():
+                    self.assertEquals(
+                        [(c.start, c.end, c.get_text(), c.layout_info)
+                         for c in expected.get_captions(lang)],
+                        [(c.start, c.end, c.get_text(), c.layout_info)
+                         for c in result[lang]])
+        finally:
+            sami._READ_CHUNK_SIZE = read_chunk_size
+
+    def test_iter_captions_empty_file(self):
+        self.assertRaises(
+            CaptionReadNoCaptions, list,
+            SAMIReader().iter_captions(SAMPLE_SAMI_EMPTY))
+
+
+class SAMIParserTestCase(unittest.TestCase):
+
+    def test_unclosed_tags_are_closed_in_lifo_order(self):
+        sami, _, langs = SAMIParser().feed(
+            u'<sami><body><sync start="1"><p>a<i>b'
+            u'<sync start="2"><p>c&amp;d</body></sami>')
+
+        self.assertEquals(
+            sami,
+            u'<sami><body><sync start="1"><p lang="en-US">a'
+            u'<span style="font-style:italic;">b</span></p></sync>'
+            u'<sync start="2"><p lang="en-US">c&d</p></sync></body></sami>')
+        self.assertEquals(langs, set([u'en-US']))
+
+    def test_css_parse_normalizes_like_cssutils(self):
+        css = (u'<!--\nP {margin-left: 29pt; font-size: 24.50PT; '
+               u'font-family: "Times New Roman", serif; color: #FFF; '
+               u'background-color: #000000;}\n'
+               u'.SUBTTL {Name: \'Subtitles\'; Lang: en-US; color: Navy;}\n'
+               u'#Small {margin: 0px 1.0em; lang: en-US; lang: fr-FR}\n-->')
+
+        self.assertEquals(
+            SAMIParser()._css_parse(css),
+            {u'p': {u'margin-left': u'29pt', u'font-size': u'24.5pt',
+                    u'font-family': u'"Times New Roman", serif',
+                    u'color': u'#ffffff', u'background-color': u'#000'},
+             u'subttl': {u'name': u'"Subtitles"', u'lang': u'en-US',
+                         u'color': u'#000080'},
+             u'small': {u'margin': u'0 1em', u'lang': u'fr-FR'}})
+
+    def test_css_parse_falls_back_to_cssutils(self):
+        css = u'.encc {color: rgb(255, 0, 0); lang: en-US}'
+
+        self.assertEquals(
+            SAMIParser()._css_parse(css),
+            {u'encc': {u'color': u'#ff0000', u'lang': u'en-US'}})
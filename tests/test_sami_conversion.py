@@ -1,4 +1,6 @@
+import re
 import unittest
+from io import StringIO
 
 from pycaption import (
     SAMIReader, SAMIWriter, SRTWriter, DFXPWriter, WebVTTWriter)
@@ -13,7 +15,7 @@ from .samples.sami import (
     SAMPLE_SAMI_PARTIAL_MARGINS_RELATIVIZED, SAMPLE_SAMI_LANG_MARGIN,
     SAMPLE_SAMI_WITH_SPAN, SAMPLE_SAMI_WITH_BAD_SPAN_ALIGN,
     SAMPLE_SAMI_WITH_MULTIPLE_SPAN_ALIGNS, SAMPLE_SAMI_NO_LANG,
-    SAMPLE_SAMI_WITH_LANG
+    SAMPLE_SAMI_WITH_LANG, SAMPLE_SAMI_MULTI_LANG
 )
 from .samples.srt import SAMPLE_SRT
 from .samples.webvtt import SAMPLE_WEBVTT_FROM_SAMI
@@ -42,6 +44,45 @@ class SAMItoSAMITestCase(unittest.TestCase, SAMITestingMixIn):
         ).write(caption_set)
         self.assertEqual(result, SAMPLE_SAMI_PARTIAL_MARGINS_RELATIVIZED)
 
+    def test_multiple_languages_share_sorted_syncs(self):
+        caption_set = SAMIReader().read(SAMPLE_SAMI_MULTI_LANG)
+        results = SAMIWriter(relativize=False,
+                             fit_to_screen=False).write(caption_set)
+
+        starts = [int(start)
+                  for start in re.findall(u'<sync start="(\d+)"', results)]
+        self.assertEqual(sorted(set(starts)), starts)
+        result_set = SAMIReader().read(results)
+        for lang in caption_set.get_languages():
+            self.assertEqual(
+                [c.start for c in caption_set.get_captions(lang)],
+                [c.start for c in result_set.get_captions(lang)
+                 if c.get_text() != u'\xa0']
+            )
+
+    def test_write_to_file_object(self):
+        caption_set = SAMIReader().read(SAMPLE_SAMI)
+        writer = SAMIWriter(relativize=False, fit_to_screen=False)
+        output = StringIO()
+
+        writer.write_to(caption_set, output)
+
+        self.assertEqual(writer.write(caption_set), output.getvalue())
+
+    def test_caption_set_is_not_modified(self):
+        caption_set = SAMIReader().read(SAMPLE_SAMI_PARTIAL_MARGINS)
+        styles = dict(
+            (selector, dict(rules))
+            for selector, rules in caption_set.get_styles())
+        layout_info = caption_set.get_layout_info(u'en-US')
+
+        SAMIWriter(
+            video_width=VIDEO_WIDTH, video_height=VIDEO_HEIGHT
+        ).write(caption_set)
+
+        self.assertEqual(styles, dict(caption_set.get_styles()))
+        self.assertEqual(layout_info, caption_set.get_layout_info(u'en-US'))
+
 
 class SAMItoSRTTestCase(unittest.TestCase, SRTTestingMixIn):
 
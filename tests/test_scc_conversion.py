@@ -36,6 +36,22 @@ class SRTtoSCCtoSRTTestCase(unittest.TestCase, CaptionSetTestingMixIn):
     def test_srt_to_scc_to_srt_conversion(self):
         self._test_srt_to_scc_to_srt_conversion(SAMPLE_SRT_ASCII)
 
+    def test_write_languages(self):
+        caption_set = SRTReader().read(SAMPLE_SRT_ASCII)
+        caption_set.set_captions(
+            u'fr', caption_set.get_captions(u'en-US')[1:])
+
+        french = SRTReader().read(SAMPLE_SRT_ASCII, lang=u'fr')
+        french.set_captions(u'fr', french.get_captions(u'fr')[1:])
+
+        results = SCCWriter(processes=2).write_languages(caption_set)
+
+        self.assertEqual([u'en-US', u'fr'], sorted(results))
+        self.assertEqual(
+            SCCWriter().write(SRTReader().read(SAMPLE_SRT_ASCII)),
+            results[u'en-US'])
+        self.assertEqual(SCCWriter().write(french), results[u'fr'])
+
 # The following test fails -- maybe a bug with SCCReader
 #    def test_srt_to_srt_unicode_conversion(self):
 #        self._test_srt_to_scc_to_srt_conversion(SAMPLE_SRT_UNICODE)
@@ -1,8 +1,13 @@
 import unittest
+from io import StringIO
 
-from pycaption import SRTReader, CaptionReadNoCaptions
+from pycaption import (
+    SRTReader, SRTWriter, CaptionReadNoCaptions, CaptionReadSyntaxError)
 
-from .samples.srt import SAMPLE_SRT, SAMPLE_SRT_NUMERIC, SAMPLE_SRT_EMPTY
+from .samples.srt import (
+    SAMPLE_SRT, SAMPLE_SRT_NUMERIC, SAMPLE_SRT_EMPTY,
+    SAMPLE_SRT_CRLF_WITHOUT_INDICES, SAMPLE_SRT_INVALID_TIMING
+)
 
 
 class SRTReaderTestCase(unittest.TestCase):
@@ -26,7 +31,75 @@ class SRTReaderTestCase(unittest.TestCase):
         captions = SRTReader().read(SAMPLE_SRT_NUMERIC)
         self.assertEquals(7, len(captions.get_captions(u"en-US")))
 
+    def test_crlf_without_indices(self):
+        captions = SRTReader().read(SAMPLE_SRT_CRLF_WITHOUT_INDICES)
+        captions = captions.get_captions(u"en-US")
+
+        self.assertEquals(3, len(captions))
+        self.assertEquals(
+            [(9209000, 12312000), (14848000, 17000000), (17000000, 18752000)],
+            [(caption.start, caption.end) for caption in captions])
+        self.assertEquals(u'MAN:\nWhen we think', captions[1].get_text())
+
+    def test_parallel_read_matches_serial_read(self):
+        for sample in [SAMPLE_SRT, SAMPLE_SRT_CRLF_WITHOUT_INDICES]:
+            expected = SRTReader().read(sample).get_captions(u"en-US")
+            result = SRTReader(processes=3).read(sample).get_captions(u"en-US")
+
+            self.assertEquals(
+                [(c.start, c.end, c.get_text()) for c in expected],
+                [(c.start, c.end, c.get_text()) for c in result])
+
+    def test_raw_content(self):
+        expected = SRTReader().read(SAMPLE_SRT).get_captions(u"en-US")
+
+        for content, encoding in [
+                (SAMPLE_SRT.encode('utf-8'), 'utf-8'),
+                (bytearray(SAMPLE_SRT.encode('utf-16')), None)]:
+            result = SRTReader().read(content, encoding=encoding)
+
+            self.assertEquals(
+                [(c.start, c.end, c.get_text()) for c in expected],
+                [(c.start, c.end, c.get_text())
+                 for c in result.get_captions(u"en-US")])
+
+    def test_read_reports_line_of_error(self):
+        content = (SAMPLE_SRT_INVALID_TIMING +
+                   u'\n3\n00:00:18,000 --> 00:00:19,000\nWe have\n')
+
+        for reader in [SRTReader(), SRTReader(processes=3)]:
+            with self.assertRaises(CaptionReadSyntaxError) as context:
+                reader.read(content)
+            self.assertIn(u'(line 6)', context.exception.args[0])
+
     def test_empty_file(self):
         self.assertRaises(
             CaptionReadNoCaptions,
             SRTReader().read, SAMPLE_SRT_EMPTY)
+
+    def test_iter_captions_matches_read(self):
+        for sample in [SAMPLE_SRT, SAMPLE_SRT_CRLF_WITHOUT_INDICES]:
+            expected = SRTReader().read(sample).get_captions(u"en-US")
+            result = list(SRTReader().iter_captions(StringIO(sample)))
+
+            self.assertEquals(
+                [(c.start, c.end, c.get_text()) for c in expected],
+                [(c.start, c.end, c.get_text()) for c in result])
+
+    def test_iter_captions_reports_line_of_error(self):
+        captions = SRTReader().iter_captions(SAMPLE_SRT_INVALID_TIMING)
+
+        self.assertEquals(9209000, next(captions).start)
+        with self.assertRaises(CaptionReadSyntaxError) as context:
+            next(captions)
+        self.assertIn(u'(line 6)', context.exception.args[0])
+
+    def test_iter_captions_to_writer(self):
+        output = StringIO()
+
+        SRTWriter().write_captions(
+            SRTReader().iter_captions(StringIO(SAMPLE_SRT)), output)
+
+        self.assertEquals(
+            SRTWriter().write(SRTReader().read(SAMPLE_SRT)),
+            output.getvalue())
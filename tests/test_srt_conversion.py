@@ -1,4 +1,5 @@
 import unittest
+from io import StringIO
 
 from pycaption import (
     SRTReader, SRTWriter, SAMIWriter, DFXPWriter, WebVTTWriter)
@@ -20,6 +21,15 @@ class SRTtoSRTTestCase(unittest.TestCase, SRTTestingMixIn):
         self.assertTrue(isinstance(results, unicode))
         self.assertSRTEquals(SAMPLE_SRT, results)
 
+    def test_write_to_file_object(self):
+        caption_set = SRTReader().read(SAMPLE_SRT)
+        output = StringIO()
+
+        SRTWriter().write_to(caption_set, output)
+
+        self.assertEqual(SRTWriter().write(caption_set), output.getvalue())
+        self.assertSRTEquals(SAMPLE_SRT, output.getvalue())
+
 
 class SRTtoSAMITestCase(unittest.TestCase, SAMITestingMixIn):
 
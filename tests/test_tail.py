@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pycaption import (
+    SRTReader, WebVTTReader, TailState, CaptionReadError)
+
+from .samples.srt import SAMPLE_SRT
+from .samples.webvtt import SAMPLE_WEBVTT
+
+
+class TailTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'captions')
+        open(self.path, 'wb').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _append(self, content):
+        with open(self.path, 'ab') as f:
+            f.write(content.encode('utf-8'))
+
+    def _read_tail(self, reader, state=None, final=False):
+        with open(self.path, 'rb') as f:
+            return reader.read_tail(f, state, final=final)
+
+    def _assert_reads_growing_file(self, reader, content):
+        expected = [
+            (c.start, c.end, c.get_text())
+            for c in reader.read(content).get_captions(u'en-US')
+        ]
+
+        captions = []
+        state = None
+        for position in range(0, len(content), 50):
+            self._append(content[position:position + 50])
+            new_captions, state = self._read_tail(reader, state)
+            captions.extend(new_captions)
+            # As if the state was saved by a worker and loaded by another
+            state = TailState(*state.serialized())
+        new_captions, state = self._read_tail(reader, state, final=True)
+        captions.extend(new_captions)
+
+        self.assertEqual(
+            expected, [(c.start, c.end, c.get_text()) for c in captions])
+
+    def test_srt_read_tail(self):
+        self._assert_reads_growing_file(SRTReader(), SAMPLE_SRT)
+
+    def test_webvtt_read_tail(self):
+        self._assert_reads_growing_file(WebVTTReader(), SAMPLE_WEBVTT)
+
+    def test_partial_cue_is_held_back(self):
+        self._append(u'1\n00:00:01,000 --> 00:00:02,000\nfoo\n\n'
+                     u'2\n00:00:03,000 --> 00:00:04,000\nbar\n')
+
+        captions, state = self._read_tail(SRTReader())
+        self.assertEqual([u'foo'], [c.get_text() for c in captions])
+        self.assertEqual(TailState(37, 4, 1000000), state)
+
+        captions, state = self._read_tail(SRTReader(), state)
+        self.assertEqual([], captions)
+        self.assertEqual(TailState(37, 4, 1000000), state)
+
+        self._append(u'baz\n\n')
+        captions, state = self._read_tail(SRTReader(), state)
+        self.assertEqual([u'bar\nbaz'], [c.get_text() for c in captions])
+
+    def test_srt_error_reports_line_in_file(self):
+        self._append(u'1\n00:00:01,000 --> 00:00:02,000\nfoo\n\n')
+        captions, state = self._read_tail(SRTReader())
+
+        self._append(u'2\n00:00:03,000 -> 00:00:04,000\nbar\n\n')
+        with self.assertRaises(CaptionReadError) as context:
+            self._read_tail(SRTReader(), state)
+        self.assertTrue(context.exception.args[0].endswith(u'(line 6)'))
+
+    def test_webvtt_order_is_checked_across_reads(self):
+        reader = WebVTTReader(ignore_timing_errors=False)
+        self._append(u'WEBVTT\n\n00:20.000 --> 00:30.000\nfoo\n\n')
+        captions, state = self._read_tail(reader)
+        self.assertEqual(TailState(37, 5, 20000000), state)
+
+        self._append(u'00:10.000 --> 00:20.000\nbar\n\n')
+        with self.assertRaises(CaptionReadError) as context:
+            self._read_tail(reader, state)
+        self.assertTrue(context.exception.args[0].endswith(u'(line 5)'))
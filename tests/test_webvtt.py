@@ -1,11 +1,17 @@
+import codecs
 import unittest
+from copy import deepcopy
+from io import StringIO
 
 from pycaption import (
-    WebVTTReader, WebVTTWriter, SAMIReader, DFXPReader,
+    WebVTTReader, WebVTTWriter, SAMIReader, DFXPReader, SRTReader, CaptionNode,
     CaptionReadNoCaptions, CaptionReadError, CaptionReadSyntaxError
 )
+from pycaption.exceptions import InvalidInputError
+from pycaption.geometry import Layout, Point, Size, UnitEnum
 
-from .samples.dfxp import DFXP_STYLE_REGION_ALIGN_CONFLICT
+from .samples.dfxp import (
+    DFXP_STYLE_REGION_ALIGN_CONFLICT, SAMPLE_DFXP_WITH_POSITIONING)
 from .samples.sami import SAMPLE_SAMI_DOUBLE_BR
 from .samples.srt import SAMPLE_SRT
 from .samples.webvtt import (
@@ -117,6 +123,117 @@ class WebVTTReaderTestCase(unittest.TestCase):
         except CaptionReadError:
             self.fail(u"Shouldn't raise CaptionReadError")
 
+    def test_decode_cue_text(self):
+        self.assertEqual(
+            u'Bob: <hi> & \u00a0bye',
+            self.reader._decode(
+                u' <v.loud Bob><i>&lt;hi&gt;</i> &amp; <c.a>&nbsp;bye</c> '))
+        # The tags are stripped off before the entities are decoded
+        self.assertEqual(u'<', self.reader._decode(u'&l<b>t;'))
+
+    def test_keep_styles(self):
+        captions = WebVTTReader(keep_styles=True).read(
+            u"WEBVTT\n\n00:01.000 --> 00:02.000\n"
+            u"<i>Hello</i> <c.red.big>world</c>\n")
+        nodes = captions.get_captions(u'en-US')[0].nodes
+
+        self.assertEqual(
+            [(CaptionNode.STYLE, True, {u'italics': True}),
+             (CaptionNode.TEXT, None, u'Hello'),
+             (CaptionNode.STYLE, False, {u'italics': True}),
+             (CaptionNode.TEXT, None, u' '),
+             (CaptionNode.STYLE, True, {u'class': u'red'}),
+             (CaptionNode.TEXT, None, u'world'),
+             (CaptionNode.STYLE, False, {u'class': u'red'})],
+            [(node.type_, node.start, node.content) for node in nodes])
+
+    def test_keep_styles_closes_styles_at_end_of_cue(self):
+        captions = WebVTTReader(keep_styles=True).read(
+            u"WEBVTT\n\n00:01.000 --> 00:02.000\n<b>Hello <u>world\n")
+        nodes = captions.get_captions(u'en-US')[0].nodes
+
+        self.assertEqual(
+            [(False, {u'text-decoration': u'underline'}),
+             (False, {u'font-weight': u'bold'})],
+            [(node.start, node.content) for node in nodes[-2:]])
+
+    def test_raw_content(self):
+        expected = WebVTTReader().read(SAMPLE_WEBVTT)
+        content = bytearray(
+            codecs.BOM_UTF8 + SAMPLE_WEBVTT.encode('utf-8'))
+        result = WebVTTReader().read(content)
+
+        self.assertEqual(
+            [(c.start, c.end, c.get_text())
+             for c in expected.get_captions(u'en-US')],
+            [(c.start, c.end, c.get_text())
+             for c in result.get_captions(u'en-US')])
+
+    def test_raw_content_decodes_only_the_cues(self):
+        # The NOTE isn't valid UTF-8, but it's dropped without being decoded
+        content = (b'WEBVTT\n\nNOTE \xe9t\xe9\n\n'
+                   b'00:01.000 --> 00:02.000\n\xc3\xa9t\xc3\xa9\n')
+
+        for reader in [WebVTTReader(), WebVTTReader(processes=2)]:
+            captions = reader.read(content, encoding='utf-8')
+
+            self.assertEqual(
+                [u'\xe9t\xe9'],
+                [c.get_text() for c in captions.get_captions(u'en-US')])
+
+    def test_raw_content_rejects_memoryview(self):
+        self.assertRaises(
+            InvalidInputError, WebVTTReader().read,
+            memoryview(SAMPLE_WEBVTT.encode('utf-8')))
+
+    def test_iter_captions_matches_read(self):
+        expected = WebVTTReader().read(SAMPLE_WEBVTT_2)
+        metadata = []
+
+        result = list(WebVTTReader().iter_captions(
+            StringIO(SAMPLE_WEBVTT_2),
+            metadata_handler=lambda i, line: metadata.append((i, line))))
+
+        self.assertEqual(
+            [(c.start, c.end, c.get_text())
+             for c in expected.get_captions(u'en-US')],
+            [(c.start, c.end, c.get_text()) for c in result])
+        self.assertEqual((0, u'WEBVTT'), metadata[0])
+
+    def test_iter_captions_reports_line_of_error(self):
+        captions = WebVTTReader(ignore_timing_errors=False).iter_captions(
+            u"00:00:20.000 --> 00:00:30.000\n"
+            u"Start times should be consecutive.\n"
+            u"\n"
+            u"00:00:10.000 --> 00:00:20.000\n"
+            u"This cue starts before the previous one.\n")
+
+        self.assertEqual(20000000, next(captions).start)
+        with self.assertRaises(CaptionReadError) as context:
+            next(captions)
+        self.assertIn(u'(line 3)', context.exception.args[0])
+
+    def test_parallel_read_matches_serial_read(self):
+        expected = WebVTTReader().read(SAMPLE_WEBVTT_2)
+        result = WebVTTReader(processes=2).read(SAMPLE_WEBVTT_2)
+
+        self.assertEqual(
+            [(c.start, c.end, c.get_text())
+             for c in expected.get_captions(u'en-US')],
+            [(c.start, c.end, c.get_text())
+             for c in result.get_captions(u'en-US')])
+
+    def test_parallel_read_checks_order_across_chunks(self):
+        with self.assertRaises(CaptionReadError) as context:
+            WebVTTReader(ignore_timing_errors=False, processes=2).read(
+                u"00:00:20.000 --> 00:00:30.000\n"
+                u"Start times should be consecutive.\n"
+                u"\n"
+                u"00:00:10.000 --> 00:00:20.000\n"
+                u"This cue starts before the previous one.\n")
+
+        self.assertIn(u'(line 3)', context.exception.args[0])
+
     def test_invalid_files(self):
         self.assertRaises(
             CaptionReadSyntaxError,
@@ -161,3 +278,88 @@ class WebVTTWriterTestCase(unittest.TestCase):
         results = WebVTTWriter().write(caption_set)
         self.assertEquals(
             WEBVTT_FROM_DFXP_WITH_CONFLICTING_ALIGN, results)
+
+    def test_cue_settings_are_rendered_once_per_layout(self):
+        layout = Layout(origin=Point(
+            Size(10, UnitEnum.PERCENT), Size(80, UnitEnum.PERCENT)))
+
+        settings = self.writer._cue_settings_from(layout)
+
+        self.assertEqual(u' position:10%,start line:80% size:90%', settings)
+        self.assertEqual(
+            settings, self.writer._cue_settings_from(deepcopy(layout)))
+        self.assertEqual(1, len(self.writer._cue_settings))
+
+        self.writer.fit_to_screen = False
+        self.assertEqual(u' position:10%,start line:80%',
+                         self.writer._cue_settings_from(layout))
+
+    def test_regions(self):
+        caption_set = DFXPReader().read(SAMPLE_DFXP_WITH_POSITIONING)
+        results = WebVTTWriter(
+            use_regions=True, video_width=640, video_height=360
+        ).write(caption_set)
+
+        self.assertTrue(results.startswith(
+            u'WEBVTT\n\n'
+            u'REGION\n'
+            u'id:r0\n'
+            u'width:50%\n'
+            u'lines:1\n'
+            u'regionanchor:0%,0%\n'
+            u'viewportanchor:25%,25%\n\n'
+            u'REGION\n'
+            u'id:r1\n'))
+        # The two first captions only differ by their alignment
+        self.assertIn(u'00:01.000 --> 00:03.000 region:r0\n', results)
+        self.assertIn(
+            u'00:03.500 --> 00:05.000 region:r0 align:right\n', results)
+        # The region of the last caption is as high as its two lines
+        self.assertIn(
+            u'id:r2\n'
+            u'width:25%\n'
+            u'lines:2\n'
+            u'regionanchor:0%,0%\n'
+            u'viewportanchor:25%,75%\n', results)
+        self.assertIn(
+            u'00:07.500 --> 00:09.000 region:r2 align:right\n', results)
+        self.assertEqual(
+            [c.get_text() for c in caption_set.get_captions(u'en-US')],
+            [c.get_text() for c in
+             WebVTTReader().read(results).get_captions(u'en-US')])
+
+    def test_region_without_extent_ends_at_right_edge(self):
+        caption_set = SRTReader().read(SAMPLE_SRT)
+        caption_set.set_layout_info(u'en-US', Layout(origin=Point(
+            Size(20, UnitEnum.PERCENT), Size(80, UnitEnum.PERCENT))))
+        writer = WebVTTWriter(use_regions=True, fit_to_screen=False)
+        writer._cue_settings_from(Layout(origin=Point(
+            Size(10, UnitEnum.PERCENT), Size(10, UnitEnum.PERCENT))))
+
+        results = writer.write(caption_set)
+
+        self.assertIn(
+            u'width:80%\n'
+            u'lines:1\n'
+            u'regionanchor:0%,0%\n'
+            u'viewportanchor:20%,80%\n', results)
+        # The cue settings rendered before are dropped by each write, so
+        # that a writer reused for many documents doesn't keep growing
+        self.assertEqual({}, writer._cue_settings)
+
+    def test_write_languages(self):
+        caption_set = DFXPReader().read(SAMPLE_DFXP_WITH_POSITIONING)
+        caption_set.set_captions(
+            u'fr', caption_set.get_captions(u'en-US')[2:])
+        writer = WebVTTWriter(video_width=640, video_height=360)
+
+        results = writer.write_languages(caption_set)
+
+        self.assertEqual([u'en-US', u'fr'], sorted(results))
+        self.assertEqual(
+            writer.write(DFXPReader().read(SAMPLE_DFXP_WITH_POSITIONING)),
+            results[u'en-US'])
+        self.assertEqual(
+            [c.get_text() for c in caption_set.get_captions(u'fr')],
+            [c.get_text() for c in
+             WebVTTReader().read(results[u'fr']).get_captions(u'en-US')])
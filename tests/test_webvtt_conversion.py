@@ -1,7 +1,8 @@
 import unittest
 
 from pycaption import (
-    WebVTTReader, WebVTTWriter, SRTWriter, SAMIWriter, DFXPWriter)
+    WebVTTReader, WebVTTWriter, SRTWriter, SAMIReader, SAMIWriter,
+    DFXPWriter, CaptionNode)
 
 from .samples.dfxp import SAMPLE_DFXP
 from .samples.sami import SAMPLE_SAMI
@@ -49,6 +50,28 @@ class WebVTTtoSAMITestCase(unittest.TestCase, SAMITestingMixIn):
         self.assertTrue(isinstance(results, unicode))
         self.assertSAMIEquals(SAMPLE_SAMI, results)
 
+    def test_styles_are_kept(self):
+        caption_set = WebVTTReader(keep_styles=True).read(
+            u"WEBVTT\n\n00:01.000 --> 00:02.000\n<b>Hello</b> <u>world\n\n"
+            u"00:03.000 --> 00:04.000\nagain\n")
+
+        results = SAMIReader().read(SAMIWriter().write(caption_set))
+        captions = results.get_captions(u'en-US')
+
+        self.assertEqual(
+            [(CaptionNode.STYLE, True, {u'font-weight': u'bold'}),
+             (CaptionNode.TEXT, None, u'Hello'),
+             (CaptionNode.STYLE, False, {u'font-weight': u'bold'}),
+             (CaptionNode.TEXT, None, u' '),
+             (CaptionNode.STYLE, True, {u'text-decoration': u'underline'}),
+             (CaptionNode.TEXT, None, u'world'),
+             (CaptionNode.STYLE, False, {u'text-decoration': u'underline'})],
+            [(node.type_, node.start, node.content)
+             for node in captions[0].nodes])
+        # The <u> tag left open doesn't go on in the next cue
+        self.assertEqual(
+            [CaptionNode.TEXT], [node.type_ for node in captions[1].nodes])
+
 
 class WebVTTtoDFXPTestCase(unittest.TestCase, DFXPTestingMixIn):
 